@@ -0,0 +1,92 @@
+# Benchmark: endpoints sync (SessionDep + threadpool) vs async (AsyncSessionDep + aiosqlite)
+"""
+Uso (desde back/):
+    python -m benchmarks.async_vs_sync --requests 2000 --concurrency 200
+
+Levanta dos apps con el mismo endpoint GET /users/{id}, una con la
+session sincrona y otra con la asincrona, y mide requests/segundo y p99.
+Sin user_cache: el camino async lo usa y el sync no, y se compararia
+una lectura cacheada contra una que va a la base.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_FILE", os.path.join(tempfile.mkdtemp(), "bench.db"))
+
+import httpx
+from fastapi import FastAPI
+
+from database.cache import user_cache
+from database.migrations import asegurar_esquema
+from database.dbase import Database
+from dependencies.dependencie import SessionDep, AsyncSessionDep
+from schema.user import CreateUser
+
+database_instance = Database()
+
+
+def crear_apps() -> dict[str, FastAPI]:
+    app_sync = FastAPI()
+    app_async = FastAPI()
+
+    @app_sync.get("/users/{id}")
+    def get_user_sync(session: SessionDep, id: int):
+        return database_instance.obtener_usuario(session, user_id=id)
+
+    @app_async.get("/users/{id}")
+    async def get_user_async(session: AsyncSessionDep, id: int):
+        return await database_instance.obtener_usuario_async(session, user_id=id)
+
+    return {"sync": app_sync, "async": app_async}
+
+
+def poblar(usuarios: int) -> None:
+    asegurar_esquema()
+    for i in range(usuarios):
+        database_instance.crear_usuario(CreateUser(
+            name=f"name{i}", lastname="Doe", age=20 + i % 50,
+            email=f"user{i}@correo", password="secreto", cv="cv.pdf",
+        ))
+
+
+async def medir(app: FastAPI, total: int, concurrencia: int, usuarios: int) -> tuple[float, float]:
+    latencias: list[float] = []
+    semaforo = asyncio.Semaphore(concurrencia)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def una(i: int) -> None:
+            async with semaforo:
+                inicio = time.perf_counter()
+                response = await client.get(f"/users/{i % usuarios + 1}")
+                latencias.append(time.perf_counter() - inicio)
+                assert response.status_code == 200
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(una(i) for i in range(total)))
+        duracion = time.perf_counter() - inicio
+
+    p99 = statistics.quantiles(latencias, n=100)[98]
+    return total / duracion, p99
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--users", type=int, default=100)
+    args = parser.parse_args()
+
+    user_cache.enabled = False
+    poblar(args.users)
+    for nombre, app in crear_apps().items():
+        rps, p99 = asyncio.run(medir(app, args.requests, args.concurrency, args.users))
+        print(f"{nombre:>5}: {rps:8.0f} req/s   p99 {p99 * 1000:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# Benchmark: GET /users/{id} autenticado, con y sin cache de tokens
+"""
+Uso (desde back/):
+    python -m benchmarks.auth_cache --requests 5000
+
+Monta el router de usuarios detras de usuario_actual (como el de admin)
+y mide requests/segundo y p50 de GET /users/{id} con un Bearer token:
+* sin autenticacion, como referencia
+* sin caches: jwt.decode y un SELECT del usuario en cada request (sin
+  user_cache el endpoint tambien lee de la base)
+* solo user_cache: jwt.decode en cada request
+* con token_cache y user_cache (la configuracion por defecto)
+Tambien mide verificar_token solo, con y sin el cache.
+"""
+import argparse
+import asyncio
+import os
+import random
+import secrets
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_FILE", os.path.join(tempfile.mkdtemp(), "bench.db"))
+os.environ.setdefault("SECRET_KEY", secrets.token_hex(32))
+
+import httpx
+from fastapi import Depends, FastAPI
+
+from benchmarks.datos import poblar_usuarios
+from database.cache import user_cache
+from database.conect import async_engine, write_engine
+from database.migrations import asegurar_esquema
+from dependencies.auth import crear_token, token_cache, usuario_actual, verificar_token
+from routers import users
+
+
+def crear_app(autenticada: bool) -> FastAPI:
+    app = FastAPI()
+    app.include_router(users.router, dependencies=[Depends(usuario_actual)] if autenticada else [])
+    return app
+
+
+async def medir(app: FastAPI, ids: list[int], headers: dict[str, str]) -> tuple[float, float]:
+    latencias: list[float] = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+        inicio = time.perf_counter()
+        for user_id in ids:
+            antes = time.perf_counter()
+            response = await client.get(f"/users/{user_id}")
+            latencias.append(time.perf_counter() - antes)
+            assert response.status_code == 200, response.text
+        duracion = time.perf_counter() - inicio
+    return len(ids) / duracion, statistics.median(latencias)
+
+
+def medir_verificacion(token: str, repeticiones: int) -> float:
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        verificar_token(token)
+    return (time.perf_counter() - inicio) / repeticiones
+
+
+async def principal(args) -> None:
+    token = crear_token(1).access_token
+    headers = {"Authorization": f"Bearer {token}"}
+    # ids repetidos: en produccion los mismos usuarios se leen muchas veces
+    ids = [random.randint(1, args.hot) for _ in range(args.requests)]
+
+    autenticada = crear_app(True)
+    casos = (
+        ("sin autenticacion", crear_app(False), True, True),
+        ("sin caches", autenticada, False, False),
+        ("solo user_cache", autenticada, False, True),
+        ("token_cache + user_cache", autenticada, True, True),
+    )
+    # calentar: conexiones del pool, TypeAdapters, etc.
+    await medir(casos[0][1], ids[:500], headers)
+    for nombre, app, con_token_cache, con_user_cache in casos:
+        token_cache.enabled = con_token_cache
+        user_cache.enabled = con_user_cache
+        token_cache.clear()
+        user_cache.clear()
+        rps, p50 = await medir(app, ids, headers)
+        print(f"{nombre:>26}: {rps:8.0f} req/s   p50 {p50 * 1e6:8.1f} us")
+    await async_engine.dispose()
+
+    for caches in (False, True):
+        token_cache.enabled = caches
+        print(f"verificar_token (cache={caches}): {medir_verificacion(token, 20_000) * 1e6:6.2f} us")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--hot", type=int, default=100, help="usuarios distintos que se leen")
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    asegurar_esquema()
+    poblar_usuarios(write_engine, args.users)
+    asyncio.run(principal(args))
+
+
+if __name__ == "__main__":
+    main()
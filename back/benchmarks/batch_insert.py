@@ -0,0 +1,71 @@
+# Benchmark: POST /users/ uno por uno vs POST /users/batch
+"""
+Uso (desde back/):
+    python -m benchmarks.batch_insert --users 5000 --batch 1000
+
+Crea la misma cantidad de usuarios por los dos caminos y compara filas/segundo.
+Cada camino usa sus propios emails (son unicos). Los dos pagan un Argon2
+por usuario, que con los parametros de produccion tapa la diferencia de
+las escrituras: por defecto se usan los minimos (ARGON2_* los cambia).
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_FILE", os.path.join(tempfile.mkdtemp(), "bench.db"))
+# todas las requests vienen del mismo cliente: sin rate limit
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("ARGON2_TIME_COST", "1")
+os.environ.setdefault("ARGON2_MEMORY_COST", "64")
+os.environ.setdefault("ARGON2_PARALLELISM", "1")
+
+import httpx
+
+from benchmarks.datos import fila_usuario
+from database.migrations import asegurar_esquema
+from main import app
+
+
+async def uno_por_uno(client: httpx.AsyncClient, cantidad: int) -> None:
+    for i in range(cantidad):
+        response = await client.post("/users/", json=fila_usuario(i))
+        assert response.status_code == 200
+
+
+async def en_lotes(client: httpx.AsyncClient, cantidad: int, lote: int, desde: int) -> None:
+    # desde: primer numero de usuario, para no repetir los emails de uno_por_uno
+    for inicio in range(desde, desde + cantidad, lote):
+        filas = [fila_usuario(i) for i in range(inicio, min(inicio + lote, desde + cantidad))]
+        response = await client.post("/users/batch", json=filas)
+        assert response.status_code == 200
+
+
+async def medir(cantidad: int, lote: int) -> None:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        inicio = time.perf_counter()
+        await uno_por_uno(client, cantidad)
+        simple = cantidad / (time.perf_counter() - inicio)
+
+        inicio = time.perf_counter()
+        await en_lotes(client, cantidad, lote, desde=cantidad)
+        lotes = cantidad / (time.perf_counter() - inicio)
+
+    print(f"POST /users/      : {simple:9.0f} filas/s")
+    print(f"POST /users/batch : {lotes:9.0f} filas/s  ({lotes / simple:.1f}x)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--batch", type=int, default=1000)
+    args = parser.parse_args()
+
+    asegurar_esquema()
+    asyncio.run(medir(args.users, args.batch))
+
+
+if __name__ == "__main__":
+    main()
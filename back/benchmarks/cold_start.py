@@ -0,0 +1,61 @@
+# Benchmark: arranque en frio de un worker
+"""
+Uso (desde back/):
+    python -m benchmarks.cold_start --runs 10
+
+Lanza procesos nuevos sobre una base ya creada y mide cuanto tarda el
+paso de esquema al arrancar:
+* create_all: lo que hacia main.py al importarse (refleja cada tabla).
+* version: asegurar_esquema(), que solo lee schema_version.
+Tambien mide el tiempo total del proceso (import de main + arranque).
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+SCRIPT = """
+import time
+inicio = time.perf_counter()
+import main
+importado = time.perf_counter()
+if {modo!r} == "create_all":
+    from sqlmodel import SQLModel
+    from database.conect import write_engine
+    SQLModel.metadata.create_all(write_engine)
+else:
+    from database.migrations import asegurar_esquema
+    asegurar_esquema()
+fin = time.perf_counter()
+print(fin - importado, fin - inicio)
+"""
+
+
+def correr(modo: str, entorno: dict[str, str]) -> tuple[float, float]:
+    salida = subprocess.run(
+        [sys.executable, "-c", SCRIPT.format(modo=modo)],
+        env=entorno, capture_output=True, text=True, check=True,
+    ).stdout.split()
+    return float(salida[0]), float(salida[1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    entorno = dict(os.environ)
+    entorno.setdefault("DATABASE_FILE", os.path.join(tempfile.mkdtemp(), "bench.db"))
+    correr("version", entorno)  # crea la base una vez
+
+    for modo in ("create_all", "version"):
+        medidas = [correr(modo, entorno) for _ in range(args.runs)]
+        esquema = statistics.median(m[0] for m in medidas)
+        total = statistics.median(m[1] for m in medidas)
+        print(f"{modo:>10}: esquema {esquema * 1000:7.2f} ms   proceso {total * 1000:8.1f} ms (mediana)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# Benchmark: bytes en la red y costo de CPU de gzip por nivel
+"""
+Uso (desde back/):
+    python -m benchmarks.compression --users 100 --repeat 200
+
+Comprime los mismos cuerpos que devuelve la API (una pagina de usuarios
+en JSON y en MessagePack, un usuario suelto y un export NDJSON) con los
+niveles 1, 5 y 9. Tambien mide cuanto cuesta un acierto en el cache de
+respuestas comprimidas del middleware (hash del cuerpo + lookup).
+"""
+import argparse
+import gzip
+import time
+
+import msgpack
+
+from middleware.compresion import GZipMiddleware
+from responses.serializacion import adaptador
+from schema.user import UpsertUser
+
+NIVELES = (1, 5, 9)
+
+
+def medir(funcion, repeticiones: int) -> float:
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.perf_counter() - inicio) / repeticiones
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--export", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    usuarios = [
+        UpsertUser.model_construct(user_id=i, name=f"name{i}", lastname="Doe", age=18 + i % 60, email=f"user{i}@correo.com")
+        for i in range(max(args.users, args.export))
+    ]
+    tipo = list[UpsertUser]
+    cuerpos = {
+        "1 usuario (json)": adaptador(UpsertUser).dump_json(usuarios[0]),
+        f"{args.users} usuarios (json)": adaptador(tipo).dump_json(usuarios[:args.users]),
+        f"{args.users} usuarios (msgpack)": msgpack.packb(adaptador(tipo).dump_python(usuarios[:args.users], mode="json")),
+        f"export {args.export} (ndjson)": b"\n".join(adaptador(UpsertUser).dump_json(u) for u in usuarios[:args.export]),
+    }
+    for nombre, cuerpo in cuerpos.items():
+        repeticiones = args.repeat if len(cuerpo) < 100_000 else max(args.repeat // 20, 3)
+        print(f"{nombre}: {len(cuerpo) / 1024:.1f} KiB sin comprimir")
+        for nivel in NIVELES:
+            comprimido = gzip.compress(cuerpo, nivel, mtime=0)
+            segundos = medir(lambda: gzip.compress(cuerpo, nivel, mtime=0), repeticiones)
+            print(
+                f"  nivel {nivel}: {len(comprimido) / 1024:8.1f} KiB ({len(comprimido) / len(cuerpo):5.1%})"
+                f"   {segundos * 1e6:9.1f} us   {len(cuerpo) / segundos / 2**20:7.1f} MiB/s"
+            )
+        middleware = GZipMiddleware(None, level=5)
+        middleware.comprimir(cuerpo)
+        print(f"  cache (nivel 5): {medir(lambda: middleware.comprimir(cuerpo), repeticiones) * 1e6:9.1f} us")
+
+
+if __name__ == "__main__":
+    main()
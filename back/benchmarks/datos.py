@@ -0,0 +1,26 @@
+# Datos de prueba compartidos por los benchmarks
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+
+from schema.user import User
+
+NOMBRES = ["Jhon", "Maria", "Pedro", "Lucia", "Carlos", "Ana", "Jorge", "Sofia"]
+APELLIDOS = ["Doe", "Perez", "Gomez", "Rodriguez", "Fernandez", "Lopez", "Diaz"]
+
+
+def fila_usuario(i: int) -> dict:
+    return {
+        "name": f"{NOMBRES[i % len(NOMBRES)]}{i}",
+        "lastname": APELLIDOS[i % len(APELLIDOS)],
+        "age": 18 + i % 60,
+        "email": f"user{i}@correo.com",
+        "password": f"secreto{i}",
+        "cv": f"cv_{i}.pdf",
+    }
+
+
+def poblar_usuarios(engine: Engine, cantidad: int, lote: int = 50_000) -> None:
+    """Inserta `cantidad` usuarios con executemany, en transacciones de `lote` filas."""
+    for inicio in range(0, cantidad, lote):
+        with engine.begin() as conn:
+            conn.execute(insert(User), [fila_usuario(i) for i in range(inicio, min(inicio + lote, cantidad))])
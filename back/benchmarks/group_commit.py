@@ -0,0 +1,78 @@
+# Benchmark: POST /users/ con y sin group commit
+"""
+Uso (desde back/):
+    python -m benchmarks.group_commit --requests 2000
+
+Mide inserts/segundo y p99 de POST /users/ con 1, 16 y 128 clientes
+concurrentes, con el escritor en modo una-transaccion-por-request y en
+modo group commit. Por defecto usa el perfil "durable" (fsync en cada
+commit), que es donde el group commit se nota; SQLITE_PROFILE lo cambia.
+Cada corrida usa sus propios emails (son unicos), y Argon2 con el costo
+minimo para medir las escrituras y no el hash (ARGON2_* lo cambia).
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_FILE", os.path.join(tempfile.mkdtemp(), "bench.db"))
+# todas las requests vienen del mismo cliente: sin rate limit
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("SQLITE_PROFILE", "durable")
+os.environ.setdefault("ARGON2_TIME_COST", "1")
+os.environ.setdefault("ARGON2_MEMORY_COST", "64")
+os.environ.setdefault("ARGON2_PARALLELISM", "1")
+
+import httpx
+
+from database.migrations import asegurar_esquema
+from database.writer import writer
+from main import app
+
+CONCURRENCIAS = (1, 16, 128)
+
+
+async def medir(total: int, concurrencia: int, prefijo: str) -> tuple[float, float]:
+    latencias: list[float] = []
+    semaforo = asyncio.Semaphore(concurrencia)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def una(i: int) -> None:
+            async with semaforo:
+                inicio = time.perf_counter()
+                response = await client.post("/users/", json={
+                    "name": f"name{i}", "lastname": "Doe", "age": 30,
+                    "email": f"{prefijo}-user{i}@correo", "password": "secreto", "cv": "cv.pdf",
+                })
+                latencias.append(time.perf_counter() - inicio)
+                assert response.status_code == 200, response.text
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(una(i) for i in range(total)))
+        duracion = time.perf_counter() - inicio
+
+    return total / duracion, statistics.quantiles(latencias, n=100)[98]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--window-ms", type=float, default=2)
+    args = parser.parse_args()
+
+    asegurar_esquema()
+    for group_commit in (False, True):
+        writer.group_commit = group_commit
+        writer.group_window = args.window_ms / 1000
+        modo = "group" if group_commit else "single"
+        for concurrencia in CONCURRENCIAS:
+            rps, p99 = asyncio.run(medir(args.requests, concurrencia, prefijo=f"{modo}{concurrencia}"))
+            print(f"{modo:>6} c={concurrencia:<4} {rps:8.0f} inserts/s   p99 {p99 * 1000:7.2f} ms")
+    print(writer.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# Benchmark: tamano y tiempo de JSON vs MessagePack para 1.000 usuarios
+"""
+Uso (desde back/):
+    python -m benchmarks.msgpack_vs_json --users 1000
+
+Codifica la misma lista de UpsertUser como lo hace respuesta(): JSON con
+dump_json y MessagePack con dump_python + msgpack.packb. Tambien mide
+el decode del lado del cliente.
+"""
+import argparse
+import json
+import time
+
+import msgpack
+
+from responses.serializacion import adaptador
+from schema.user import UpsertUser
+
+
+def medir(funcion, repeticiones: int) -> float:
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.perf_counter() - inicio) / repeticiones
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    usuarios = [
+        UpsertUser.model_construct(user_id=i, name=f"name{i}", lastname="Doe", age=18 + i % 60, email=f"user{i}@correo.com")
+        for i in range(args.users)
+    ]
+    tipo = list[UpsertUser]
+    cuerpo_json = adaptador(tipo).dump_json(usuarios)
+    cuerpo_msgpack = msgpack.packb(adaptador(tipo).dump_python(usuarios, mode="json"))
+
+    filas = (
+        ("json", cuerpo_json,
+         lambda: adaptador(tipo).dump_json(usuarios), lambda: json.loads(cuerpo_json)),
+        ("msgpack", cuerpo_msgpack,
+         lambda: msgpack.packb(adaptador(tipo).dump_python(usuarios, mode="json")), lambda: msgpack.unpackb(cuerpo_msgpack)),
+    )
+    for nombre, cuerpo, codificar, decodificar in filas:
+        print(
+            f"{nombre:>8}: {len(cuerpo) / 1024:7.1f} KiB   encode {medir(codificar, args.repeat) * 1000:6.3f} ms"
+            f"   decode {medir(decodificar, args.repeat) * 1000:6.3f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
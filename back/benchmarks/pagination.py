@@ -0,0 +1,66 @@
+# Benchmark: paginacion con OFFSET vs keyset (cursor sobre id)
+"""
+Uso (desde back/):
+    python -m benchmarks.pagination --users 1000000 --page-size 20
+
+Mide la latencia de leer la pagina 1, 1.000 y 10.000 con
+LIMIT/OFFSET (como el tutorial de heroes) y con WHERE id > cursor.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_FILE", os.path.join(tempfile.mkdtemp(), "bench.db"))
+
+from sqlmodel import Session, select
+
+from benchmarks.datos import poblar_usuarios
+from database.conect import engine, write_engine
+from database.migrations import asegurar_esquema
+from schema.user import User
+
+PAGINAS = (1, 1_000, 10_000)
+
+
+def medir(funcion, repeticiones: int) -> float:
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    asegurar_esquema()
+    poblar_usuarios(write_engine, args.users)
+
+    with Session(engine) as session:
+        for pagina in PAGINAS:
+            offset = (pagina - 1) * args.page_size
+            # en keyset el cliente trae el ultimo id de la pagina anterior
+            ultimo_id = offset
+
+            def con_offset():
+                session.exec(select(User).order_by(User.id).offset(offset).limit(args.page_size)).all()
+                session.expunge_all()
+
+            def con_keyset():
+                session.exec(select(User).where(User.id > ultimo_id).order_by(User.id).limit(args.page_size)).all()
+                session.expunge_all()
+
+            t_offset = medir(con_offset, args.repeat)
+            t_keyset = medir(con_keyset, args.repeat)
+            print(f"pagina {pagina:>6}: offset {t_offset * 1000:8.3f} ms   keyset {t_keyset * 1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# Benchmark: PATCH con UPDATE ... RETURNING vs get -> sqlmodel_update -> commit -> refresh
+"""
+Uso (desde back/):
+    python -m benchmarks.patch_update --updates 2000
+
+Cuenta las sentencias enviadas a SQLite por cada PATCH y mide la
+latencia media de los dos caminos sobre la conexion del escritor.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_FILE", os.path.join(tempfile.mkdtemp(), "bench.db"))
+
+from sqlalchemy import event
+from sqlmodel import Session
+
+from benchmarks.datos import poblar_usuarios
+from database.conect import write_engine
+from database.dbase import Database
+from database.migrations import asegurar_esquema
+from schema.user import UpdateUser, UpsertUser, User
+
+database_instance = Database()
+sentencias = 0
+
+
+@event.listens_for(write_engine, "before_cursor_execute")
+def _contar(conn, cursor, statement, parameters, context, executemany):
+    global sentencias
+    sentencias += 1
+
+
+def patch_ingenuo(session: Session, user_id: int, valores: dict) -> UpsertUser:
+    # el camino del tutorial de heroes
+    user_db = session.get(User, user_id)
+    user_db.sqlmodel_update(valores)
+    session.add(user_db)
+    session.commit()
+    session.refresh(user_db)
+    return database_instance._usuario_publico(user_db)
+
+
+def patch_returning(session: Session, user_id: int, valores: dict) -> UpsertUser:
+    usuario, _ = database_instance._actualizar_usuario(session, user_id, valores)
+    session.commit()
+    return usuario
+
+
+def medir(funcion, updates: int, usuarios: int) -> tuple[float, float]:
+    global sentencias
+    sentencias = 0
+    with Session(write_engine) as session:
+        inicio = time.perf_counter()
+        for i in range(updates):
+            valores = UpdateUser(age=20 + i % 50).model_dump(exclude_unset=True)
+            funcion(session, i % usuarios + 1, valores)
+            session.expunge_all()
+        duracion = time.perf_counter() - inicio
+    return sentencias / updates, duracion / updates
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--updates", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=10_000)
+    args = parser.parse_args()
+
+    asegurar_esquema()
+    poblar_usuarios(write_engine, args.users)
+    for nombre, funcion in (("get+update+refresh", patch_ingenuo), ("UPDATE RETURNING", patch_returning)):
+        por_patch, latencia = medir(funcion, args.updates, args.users)
+        print(f"{nombre:>18}: {por_patch:4.1f} sentencias/PATCH   {latencia * 1e6:8.1f} us/PATCH")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# Microbenchmark: leer el User completo vs solo las columnas publicas
+"""
+Uso (desde back/):
+    python -m benchmarks.projection --lookups 20000
+
+Compara session.get(User) + copia a UpsertUser (lo que hacia
+obtener_usuario) contra select(*COLUMNAS_PUBLICAS) + model_construct.
+Reporta lecturas/segundo y memoria asignada (pico de tracemalloc)
+por lectura.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("DATABASE_FILE", os.path.join(tempfile.mkdtemp(), "bench.db"))
+
+from sqlmodel import Session
+
+from benchmarks.datos import poblar_usuarios
+from database.conect import engine, write_engine
+from database.dbase import Database
+from database.migrations import asegurar_esquema
+from schema.user import User
+
+database_instance = Database()
+
+
+def entidad_completa(session: Session, user_id: int):
+    user = session.get(User, user_id)
+    usuario = database_instance._usuario_publico(user)
+    session.expunge_all()
+    return usuario
+
+
+def proyectada(session: Session, user_id: int):
+    return database_instance.obtener_usuario(session, user_id)
+
+
+def medir(funcion, ids: list[int]) -> float:
+    with Session(engine) as session:
+        inicio = time.perf_counter()
+        for user_id in ids:
+            funcion(session, user_id)
+        return len(ids) / (time.perf_counter() - inicio)
+
+
+def medir_por_lectura(funcion, ids: list[int]) -> float:
+    # pico de memoria de una sola lectura, promediado
+    total = 0
+    with Session(engine) as session:
+        funcion(session, ids[0])
+        for user_id in ids[:1000]:
+            tracemalloc.start()
+            funcion(session, user_id)
+            total += tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return total / min(len(ids), 1000)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=20_000)
+    args = parser.parse_args()
+
+    asegurar_esquema()
+    poblar_usuarios(write_engine, args.users)
+    ids = [random.randint(1, args.users) for _ in range(args.lookups)]
+
+    for nombre, funcion in (("entidad completa", entidad_completa), ("proyeccion", proyectada)):
+        lecturas = medir(funcion, ids)
+        bytes_por_lectura = medir_por_lectura(funcion, ids)
+        print(f"{nombre:>16}: {lecturas:8.0f} lecturas/s   {bytes_por_lectura / 1024:6.1f} KiB asignados por lectura")
+
+
+if __name__ == "__main__":
+    main()
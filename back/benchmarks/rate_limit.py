@@ -0,0 +1,91 @@
+# Microbenchmark: costo del rate limiter por request
+"""
+Uso (desde back/):
+    python -m benchmarks.rate_limit --requests 200000
+
+Llama al middleware directamente (sin HTTP ni FastAPI) delante de una
+app ASGI vacia y resta lo que cuesta la app sola: lo que queda es el
+overhead del limiter por request. Casos: ruta sin regla, cliente por
+IP, cliente por Bearer token ya verificado (sha256 + token_cache) y
+TokenBuckets.tomar() solo. Los clientes se reparten entre --clients
+claves para que la tabla tenga muchas entradas.
+"""
+import argparse
+import asyncio
+import os
+import secrets
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_FILE", os.path.join(tempfile.mkdtemp(), "bench.db"))
+os.environ.setdefault("SECRET_KEY", secrets.token_hex(32))
+
+from dependencies.auth import crear_token, verificar_token
+from middleware.rate_limit import RateLimitMiddleware, Regla, TokenBuckets
+
+# sin limite real: se mide el costo, no los 429
+REGLAS = [Regla("POST", "/users/", por_segundo=1e9, rafaga=10**9)]
+
+
+async def app_vacia(scope, receive, send) -> None:
+    return None
+
+
+async def recibir():
+    return {"type": "http.request"}
+
+
+async def enviar(message) -> None:
+    return None
+
+
+def scope(path: str, ip: str, headers: list) -> dict:
+    return {"type": "http", "method": "POST", "path": path, "client": (ip, 5000), "headers": headers}
+
+
+async def medir(app, scopes: list[dict], requests: int) -> float:
+    inicio = time.perf_counter()
+    for i in range(requests):
+        await app(scopes[i % len(scopes)], recibir, enviar)
+    return (time.perf_counter() - inicio) / requests
+
+
+async def principal(args) -> None:
+    limiter = RateLimitMiddleware(app_vacia, REGLAS, buckets=TokenBuckets(shards=64))
+    tokens = [crear_token(user_id).access_token for user_id in range(1, 101)]
+    for token in tokens:
+        verificar_token(token)  # quedan en token_cache, como despues del primer request
+
+    por_ip = [scope("/users/", f"10.0.{i // 256}.{i % 256}", []) for i in range(args.clients)]
+    por_token = [scope("/users/", "10.0.0.1", [(b"authorization", f"Bearer {token}".encode())]) for token in tokens]
+    sin_regla = [scope("/users/search", "10.0.0.1", [])]
+
+    base = await medir(app_vacia, por_ip, args.requests)
+    casos = {
+        "ruta sin regla": (limiter, sin_regla),
+        "por IP": (limiter, por_ip),
+        "por Bearer token": (limiter, por_token),
+    }
+    print(f"{'app sola':>18}: {base * 1e6:6.2f} us")
+    for nombre, (app, scopes) in casos.items():
+        total = await medir(app, scopes, args.requests)
+        print(f"{nombre:>18}: {total * 1e6:6.2f} us   overhead {(total - base) * 1e6:6.2f} us")
+
+    buckets = TokenBuckets(shards=64)
+    claves = [("POST", "/users/", "ip", f"10.0.0.{i}") for i in range(args.clients)]
+    inicio = time.perf_counter()
+    for i in range(args.requests):
+        buckets.tomar(claves[i % len(claves)], 1e9, 10**9)
+    print(f"{'tomar() solo':>18}: {(time.perf_counter() - inicio) / args.requests * 1e6:6.2f} us   ({len(buckets)} claves)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200_000)
+    parser.add_argument("--clients", type=int, default=10_000)
+    args = parser.parse_args()
+    asyncio.run(principal(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# Benchmark: busqueda FTS5 vs LIKE '%x%'
+"""
+Uso (desde back/):
+    python -m benchmarks.search --users 1000000
+
+Carga los usuarios (los triggers llenan user_fts) y compara la latencia
+de GET /users/search (MATCH + bm25) con un LIKE sobre name, lastname y
+email, que recorre toda la tabla.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_FILE", os.path.join(tempfile.mkdtemp(), "bench.db"))
+
+from sqlalchemy import text
+from sqlmodel import Session
+
+from benchmarks.datos import poblar_usuarios
+from database.conect import engine, write_engine
+from database.dbase import QUERY_BUSQUEDA, expresion_fts
+from database.migrations import asegurar_esquema
+
+QUERY_LIKE = text(
+    "SELECT id AS user_id, name, lastname, age, email FROM user "
+    "WHERE name LIKE :q OR lastname LIKE :q OR email LIKE :q LIMIT :limit"
+)
+BUSQUEDAS = ("Maria12345", "perez", "user99999", "sofia7")
+
+
+def medir(session: Session, query, parametros: dict, repeticiones: int) -> float:
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        session.execute(query, parametros).all()
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    asegurar_esquema()
+    poblar_usuarios(write_engine, args.users)
+
+    with Session(engine) as session:
+        for busqueda in BUSQUEDAS:
+            fts = medir(session, QUERY_BUSQUEDA, {"q": expresion_fts(busqueda), "limit": args.limit}, args.repeat)
+            like = medir(session, QUERY_LIKE, {"q": f"%{busqueda}%", "limit": args.limit}, args.repeat)
+            print(f"{busqueda!r:>14}: fts5 {fts * 1000:9.3f} ms   like {like * 1000:9.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# Benchmark: serializar con response_model vs respuesta_json
+"""
+Uso (desde back/):
+    python -m benchmarks.serialization --repeat 2000
+
+Camino de FastAPI con response_model: validar el valor devuelto contra
+el modelo de respuesta y despues serializarlo. Camino nuevo:
+respuesta_json(), un solo dump_json con el TypeAdapter cacheado.
+Mide un UpsertUser suelto y una lista de 1.000; si orjson esta
+instalado tambien lo compara para la lista ya pasada a dicts.
+"""
+import argparse
+import json
+import time
+
+from pydantic import TypeAdapter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from responses.serializacion import adaptador, respuesta_json
+from schema.user import UpsertUser
+
+
+def usuario(i: int) -> UpsertUser:
+    return UpsertUser.model_construct(user_id=i, name=f"name{i}", lastname="Doe", age=30, email=f"user{i}@correo")
+
+
+def medir(funcion, repeticiones: int) -> float:
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.perf_counter() - inicio) / repeticiones
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    casos = {
+        "1 usuario": (usuario(1), UpsertUser),
+        "1000 usuarios": ([usuario(i) for i in range(1000)], list[UpsertUser]),
+    }
+    for nombre, (datos, tipo) in casos.items():
+        repeticiones = args.repeat if nombre == "1 usuario" else max(args.repeat // 100, 5)
+        # lo que hace FastAPI: un TypeAdapter por endpoint, validar y despues serializar
+        campo = TypeAdapter(tipo)
+
+        def response_model():
+            valor = campo.validate_python(datos, from_attributes=True)
+            return json.dumps(campo.dump_python(valor, mode="json")).encode()
+
+        def validado_dump_json():
+            return campo.dump_json(campo.validate_python(datos, from_attributes=True))
+
+        def una_sola_vez():
+            return adaptador(tipo).dump_json(datos)
+
+        adaptador(tipo)
+        tiempos = {
+            "response_model + json.dumps": medir(response_model, repeticiones),
+            "response_model + dump_json": medir(validado_dump_json, repeticiones),
+            "respuesta_json (dump_json)": medir(una_sola_vez, repeticiones),
+            "respuesta_json (Response)": medir(lambda: respuesta_json(datos, tipo), repeticiones),
+        }
+        if orjson is not None:
+            dicts = adaptador(tipo).dump_python(datos)
+            tiempos["orjson (ya eran dicts)"] = medir(lambda: orjson.dumps(dicts), repeticiones)
+
+        print(nombre)
+        for camino, segundos in tiempos.items():
+            print(f"  {camino:>28}: {segundos * 1e6:10.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# Benchmark: respuesta completa vs ?fields=name,email
+"""
+Uso (desde back/):
+    python -m benchmarks.sparse_fields --limit 100 --repeat 500
+
+Lee paginas de usuarios con listar_usuarios_async (la misma query del
+endpoint) con todas las columnas y con la proyeccion de ?fields=, y
+las serializa como respuesta(). Reporta el tiempo de la query, el de
+serializar y los bytes de cada respuesta.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_FILE", os.path.join(tempfile.mkdtemp(), "bench.db"))
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from benchmarks.datos import poblar_usuarios
+from database.conect import async_engine, write_engine
+from database.dbase import Database, codificar_cursor
+from database.migrations import asegurar_esquema
+from responses.serializacion import respuesta_json
+
+database_instance = Database()
+CASOS = {
+    "todos los campos": None,
+    "name,email": frozenset({"name", "email"}),
+    "email": frozenset({"email"}),
+}
+
+
+async def medir(campos, args) -> tuple[float, float, int]:
+    consulta = serializacion = 0.0
+    async with AsyncSession(async_engine) as session:
+        for i in range(args.repeat):
+            cursor = codificar_cursor(i * args.limit % args.users) if i else None
+            inicio = time.perf_counter()
+            pagina = await database_instance.listar_usuarios_async(session, cursor, args.limit, campos)
+            medio = time.perf_counter()
+            cuerpo = respuesta_json(pagina, exclude_unset=campos is not None).body
+            consulta += medio - inicio
+            serializacion += time.perf_counter() - medio
+    return consulta / args.repeat, serializacion / args.repeat, len(cuerpo)
+
+
+async def principal(args) -> None:
+    for nombre, campos in CASOS.items():
+        consulta, serializacion, tamano = await medir(campos, args)
+        print(
+            f"{nombre:>16}: query {consulta * 1000:6.3f} ms   serializar {serializacion * 1000:6.3f} ms"
+            f"   {tamano / 1024:6.1f} KiB por respuesta"
+        )
+    await async_engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    asegurar_esquema()
+    poblar_usuarios(write_engine, args.users)
+    asyncio.run(principal(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# Benchmark: throughput de lecturas/escrituras mezcladas por perfil de SQLite
+"""
+Uso (desde back/):
+    python -m benchmarks.sqlite_profiles --seconds 5 --readers 4 --writers 1
+
+Para cada perfil crea una base nueva, la llena con algunos usuarios y
+durante N segundos corre hilos lectores (session.get) y escritores
+(inserts con su propia Session) al mismo tiempo.
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from sqlalchemy.exc import OperationalError
+from sqlmodel import SQLModel, Session, create_engine
+
+from database.profiles import PROFILES, aplicar_perfil
+from schema.user import User
+
+
+def insertar(session: Session, i: int) -> None:
+    session.add(User(
+        name=f"name{i}", lastname="Doe", age=20 + i % 50,
+        email=f"user{i}@correo", password="secreto", cv="cv.pdf",
+    ))
+    session.commit()
+
+
+def medir_perfil(nombre: str, segundos: float, lectores: int, escritores: int, usuarios: int) -> dict[str, float]:
+    archivo = os.path.join(tempfile.mkdtemp(), f"{nombre}.db")
+    engine = create_engine(f"sqlite:///{archivo}", connect_args={"check_same_thread": False})
+    aplicar_perfil(engine, nombre)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        for i in range(usuarios):
+            insertar(session, i)
+
+    contadores = {"reads": 0, "writes": 0, "locked": 0}
+    lock = threading.Lock()
+    fin = time.perf_counter() + segundos
+
+    def lector() -> None:
+        hechas = 0
+        with Session(engine) as session:
+            while time.perf_counter() < fin:
+                session.get(User, random.randint(1, usuarios))
+                session.expunge_all()
+                hechas += 1
+        with lock:
+            contadores["reads"] += hechas
+
+    def escritor(base: int) -> None:
+        hechas = bloqueos = 0
+        with Session(engine) as session:
+            while time.perf_counter() < fin:
+                try:
+                    insertar(session, base + hechas)
+                    hechas += 1
+                except OperationalError:
+                    session.rollback()
+                    bloqueos += 1
+        with lock:
+            contadores["writes"] += hechas
+            contadores["locked"] += bloqueos
+
+    hilos = [threading.Thread(target=lector) for _ in range(lectores)]
+    hilos += [threading.Thread(target=escritor, args=(usuarios + 10_000_000 * (n + 1),)) for n in range(escritores)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    engine.dispose()
+
+    return {clave: valor / segundos for clave, valor in contadores.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=1)
+    parser.add_argument("--users", type=int, default=1000)
+    args = parser.parse_args()
+
+    for nombre in PROFILES:
+        resultado = medir_perfil(nombre, args.seconds, args.readers, args.writers, args.users)
+        print(
+            f"{nombre:>10}: {resultado['reads']:9.0f} reads/s  "
+            f"{resultado['writes']:7.0f} writes/s  {resultado['locked']:5.1f} locked/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
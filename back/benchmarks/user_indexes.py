@@ -0,0 +1,63 @@
+# Benchmark: costo de escritura de los indices de User
+"""
+Uso (desde back/):
+    python -m benchmarks.user_indexes --users 1000000
+
+Carga la misma cantidad de usuarios en dos bases: una con el set de
+indices viejo (un indice por columna) y otra con el actual (solo email,
+la busqueda por nombre usa FTS5). Reporta inserts/segundo y tamano del
+archivo.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from sqlalchemy import text
+from sqlmodel import SQLModel, create_engine
+
+from benchmarks.datos import poblar_usuarios
+from database.profiles import aplicar_perfil
+# Modelos que tiene que conocer SQLModel.metadata
+from schema.user import User
+
+INDICES_VIEJOS = {
+    "ix_user_name": "name",
+    "ix_user_lastname": "lastname",
+    "ix_user_age": "age",
+    "ix_user_password": "password",
+    "ix_user_cv": "cv",
+}
+
+
+def medir(nombre: str, usuarios: int, indices_viejos: bool) -> None:
+    archivo = os.path.join(tempfile.mkdtemp(), f"{nombre}.db")
+    engine = aplicar_perfil(create_engine(f"sqlite:///{archivo}"), "balanced")
+    SQLModel.metadata.create_all(engine)
+    if indices_viejos:
+        with engine.begin() as conn:
+            for indice, columna in INDICES_VIEJOS.items():
+                conn.execute(text(f"CREATE INDEX {indice} ON user ({columna})"))
+
+    inicio = time.perf_counter()
+    poblar_usuarios(engine, usuarios)
+    duracion = time.perf_counter() - inicio
+    with engine.begin() as conn:
+        conn.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+    engine.dispose()
+
+    tamano = os.path.getsize(archivo) / 1024 / 1024
+    print(f"{nombre:>8}: {usuarios / duracion:9.0f} inserts/s   {tamano:8.1f} MiB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    medir("viejo", args.users, indices_viejos=True)
+    medir("actual", args.users, indices_viejos=False)
+
+
+if __name__ == "__main__":
+    main()
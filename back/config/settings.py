@@ -0,0 +1,80 @@
+# Configuracion del servidor leida desde variables de entorno (.env)
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Base de Datos
+DATABASE_FILE = os.getenv("DATABASE_FILE", "database.db")
+# Perfil de almacenamiento de SQLite: "durable", "balanced" o "throughput"
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "balanced")
+# Escritor unico: tamano maximo de la cola de escrituras pendientes
+WRITER_QUEUE_SIZE = int(os.getenv("WRITER_QUEUE_SIZE", "1000"))
+# Group commit (opcional): junta escrituras en una sola transaccion
+WRITER_GROUP_COMMIT = os.getenv("WRITER_GROUP_COMMIT", "false").lower() in ("1", "true", "yes")
+# ventana maxima de espera (ms) y maximo de operaciones por transaccion
+WRITER_GROUP_WINDOW_MS = float(os.getenv("WRITER_GROUP_WINDOW_MS", "2"))
+WRITER_GROUP_MAX_ROWS = int(os.getenv("WRITER_GROUP_MAX_ROWS", "128"))
+# Paginacion de GET /users/
+USERS_PAGE_DEFAULT = int(os.getenv("USERS_PAGE_DEFAULT", "20"))
+USERS_PAGE_MAX = int(os.getenv("USERS_PAGE_MAX", "100"))
+# Maximo de usuarios por request en POST /users/batch
+USERS_BATCH_MAX = int(os.getenv("USERS_BATCH_MAX", "1000"))
+# Maximo de ids en GET /users/?ids=1,2,3
+USERS_IDS_MAX = int(os.getenv("USERS_IDS_MAX", "1000"))
+# Cache en memoria de GET /users/{id}
+USER_CACHE_ENABLED = os.getenv("USER_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "60")) # segundos
+# Maximo de resultados de GET /users/search
+USERS_SEARCH_MAX = int(os.getenv("USERS_SEARCH_MAX", "50"))
+# Compresion gzip de las respuestas
+GZIP_ENABLED = os.getenv("GZIP_ENABLED", "true").lower() in ("1", "true", "yes")
+GZIP_MIN_SIZE = int(os.getenv("GZIP_MIN_SIZE", "1024")) # bytes, debajo no conviene
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "5")) # 1 (rapido) .. 9 (mas chico)
+GZIP_CONTENT_TYPES = tuple(os.getenv(
+    "GZIP_CONTENT_TYPES",
+    "application/json,application/x-ndjson,application/msgpack,text/csv,text/plain,text/html",
+).split(","))
+# respuestas ya comprimidas que se guardan para no volver a comprimirlas
+GZIP_CACHE_SIZE = int(os.getenv("GZIP_CACHE_SIZE", "256"))
+# Autenticacion (JWT)
+# obligatoria (main.py no arranca sin ella): una clave al azar por
+# proceso haria que cada worker rechace los tokens de los otros y que
+# todos se invaliden al reiniciar. Generarla con: openssl rand -hex 32
+SECRET_KEY = os.getenv("SECRET_KEY")
+ALGORITHM = os.getenv("ALGORITHM", "HS256")
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+# tokens ya verificados (por proceso), cada uno vence con su exp
+AUTH_TOKEN_CACHE_ENABLED = os.getenv("AUTH_TOKEN_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000"))
+# ids de los usuarios que pueden usar /admin, separados por coma: 1,2
+# (el id no cambia, el email si). Vacio: nadie
+ADMIN_USER_IDS = frozenset(int(id) for id in os.getenv("ADMIN_USER_IDS", "").split(",") if id.strip())
+# Hashing de contrasenas (Argon2) en un pool de procesos
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(os.cpu_count() or 1)))
+# tareas pendientes (en cola + ejecutandose); con mas se responde 429
+HASH_QUEUE_SIZE = int(os.getenv("HASH_QUEUE_SIZE", "64"))
+# Parametros de Argon2 (python -m security.calibracion recomienda valores).
+# Al cambiarlos, los hashes viejos se rehacen en el siguiente login
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "3"))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "65536")) # KiB
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "4"))
+# Rate limiting (token bucket por cliente, en memoria de cada proceso)
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+# escrituras de usuarios (POST /users/, /users/batch): requests por segundo y rafaga
+RATE_LIMIT_WRITES_PER_SECOND = float(os.getenv("RATE_LIMIT_WRITES_PER_SECOND", "5"))
+RATE_LIMIT_WRITES_BURST = int(os.getenv("RATE_LIMIT_WRITES_BURST", "20"))
+# POST /token (cada intento cuesta un Argon2)
+RATE_LIMIT_LOGIN_PER_SECOND = float(os.getenv("RATE_LIMIT_LOGIN_PER_SECOND", "1"))
+RATE_LIMIT_LOGIN_BURST = int(os.getenv("RATE_LIMIT_LOGIN_BURST", "5"))
+# POST /users/{id}/cv (cada una escribe hasta CV_MAX_BYTES a disco)
+RATE_LIMIT_UPLOADS_PER_SECOND = float(os.getenv("RATE_LIMIT_UPLOADS_PER_SECOND", "0.2"))
+RATE_LIMIT_UPLOADS_BURST = int(os.getenv("RATE_LIMIT_UPLOADS_BURST", "5"))
+# tabla de buckets: shards (cada uno con su lock) y segundos sin uso para borrar una entrada
+RATE_LIMIT_SHARDS = int(os.getenv("RATE_LIMIT_SHARDS", "64"))
+RATE_LIMIT_IDLE_SECONDS = float(os.getenv("RATE_LIMIT_IDLE_SECONDS", "300"))
+# CVs subidos (POST /users/{id}/cv): directorio, tamano maximo y bloque de escritura
+CV_DIR = os.getenv("CV_DIR", "cvs")
+CV_MAX_BYTES = int(os.getenv("CV_MAX_BYTES", str(5 * 1024 * 1024)))
+CV_CHUNK_SIZE = int(os.getenv("CV_CHUNK_SIZE", str(64 * 1024)))
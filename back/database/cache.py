@@ -0,0 +1,118 @@
+# Cache LRU + TTL en memoria (por proceso)
+"""
+Guarda hasta max_size entradas; cuando se llena saca la usada hace mas
+tiempo (LRU) y cada entrada vence a los ttl segundos.
+
+Las escrituras del mismo proceso invalidan la clave despues del commit.
+Para que una lectura que empezo antes de esa escritura no vuelva a
+guardar el valor viejo, la lectura pide un ticket(clave) antes de ir a
+la base y set(..., ticket=) se descarta si esa clave se invalido despues.
+
+El ticket es la generacion de la clave (sube en cada invalidacion), asi
+una escritura solo descarta las lecturas de ese mismo usuario. Las
+generaciones tambien son LRU (hasta max_size): las claves sin entrada
+tienen la generacion _piso, que sube cuando se saca una, por lo que una
+lectura de una clave olvidada se descarta en vez de guardar algo viejo.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+from config.settings import USER_CACHE_ENABLED, USER_CACHE_SIZE, USER_CACHE_TTL
+
+MISS = object()
+
+
+class LRUCache():
+    def __init__(self, max_size: int, ttl: float, enabled: bool = True) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.enabled = enabled
+        self._datos: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        # clave -> generacion de su ultima invalidacion
+        self._generaciones: OrderedDict[Hashable, int] = OrderedDict()
+        self._generacion = 0
+        self._piso = 0
+        self._invalidaciones = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, clave: Hashable) -> Any:
+        """Devuelve el valor o MISS."""
+        if not self.enabled:
+            return MISS
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                self.misses += 1
+                return MISS
+            vence, valor = entrada
+            if vence <= time.monotonic():
+                del self._datos[clave]
+                self.expirations += 1
+                self.misses += 1
+                return MISS
+            self._datos.move_to_end(clave)
+            self.hits += 1
+            return valor
+
+    def ticket(self, clave: Hashable) -> int:
+        with self._lock:
+            return self._generaciones.get(clave, self._piso)
+
+    def set(self, clave: Hashable, valor: Any, ttl: float | None = None, ticket: int | None = None) -> None:
+        if not self.enabled:
+            return
+        vence = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            if ticket is not None and ticket != self._generaciones.get(clave, self._piso):
+                # hubo una escritura mientras se leia: el valor puede estar viejo
+                return
+            self._datos[clave] = (vence, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_size:
+                self._datos.popitem(last=False)
+                self.evictions += 1
+
+    def invalidar(self, clave: Hashable) -> None:
+        with self._lock:
+            self._invalidaciones += 1
+            self._generacion += 1
+            self._generaciones[clave] = self._generacion
+            self._generaciones.move_to_end(clave)
+            if len(self._generaciones) > self.max_size:
+                self._generaciones.popitem(last=False)
+                self._piso = self._generacion
+            self._datos.pop(clave, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._invalidaciones += 1
+            self._generacion += 1
+            self._piso = self._generacion
+            self._generaciones.clear()
+            self._datos.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            consultas = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._datos),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / consultas if consultas else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self._invalidaciones,
+            }
+
+
+# GET /users/{id}: user_id -> (UpsertUser, version), la version es el ETag
+user_cache = LRUCache(USER_CACHE_SIZE, USER_CACHE_TTL, enabled=USER_CACHE_ENABLED)
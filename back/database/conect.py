@@ -1,17 +1,51 @@
-from sqlmodel import SQLModel, existscreate_engine, Session
+from sqlmodel import create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import create_async_engine
 from schema.user import User
+from config.settings import DATABASE_FILE, SQLITE_PROFILE
+from database.profiles import aplicar_perfil
 
-NAME_FILE = "database.db"
+NAME_FILE = DATABASE_FILE
 PATH_SQLITE = f"sqlite:///{NAME_FILE}"
+PATH_SQLITE_ASYNC = f"sqlite+aiosqlite:///{NAME_FILE}"
 connect_args = {"check_same_thread": False}
 
-engine = create_engine(PATH_SQLITE, connect_args=connect_args)
 
-def create_db_and_tables():
-    SQLModel.metadata.create_all(engine)
+def _transacciones_inmediatas(engine: Engine) -> Engine:
+    # pysqlite abre las transacciones por su cuenta y no antes de un SAVEPOINT;
+    # aqui SQLAlchemy emite BEGIN IMMEDIATE y toma el lock de escritura al inicio
+    @event.listens_for(engine, "connect")
+    def _sin_autobegin(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin_immediate(conn):
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+    return engine
+
 
+# Escritor: una sola conexion, todas las escrituras pasan por database/writer.py
+write_engine = create_engine(PATH_SQLITE, connect_args=connect_args, pool_size=1, max_overflow=0)
+aplicar_perfil(write_engine, SQLITE_PROFILE)
+_transacciones_inmediatas(write_engine)
+
+# Lectores: pool de conexiones de solo lectura (query_only)
+engine = create_engine(PATH_SQLITE, connect_args=connect_args)
+aplicar_perfil(engine, SQLITE_PROFILE, solo_lectura=True)
+# Motor asincrono (aiosqlite): las querys no ocupan un hilo del threadpool
+async_engine = create_async_engine(PATH_SQLITE_ASYNC)
+aplicar_perfil(async_engine.sync_engine, SQLITE_PROFILE, solo_lectura=True)
 
 def get_session():
     with Session(engine) as session:
         yield session
 
+
+async def get_async_session():
+    # expire_on_commit=False: despues del commit los atributos siguen
+    # cargados y no se dispara otra query (lazy load no existe en async)
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
@@ -1,45 +1,421 @@
+import base64
+import binascii
+import csv
+import io
+import json
+import re
+from functools import lru_cache
+from typing import Iterator, NamedTuple
+
 # FastApi
 from fastapi import HTTPException
 
 # Modelos Publicos
 from schema.user import (
     UpsertUser, CreateUser, UpdateUser, DeleteUser,
-    User
+    PaginaUsuarios, UsuariosPorId, EstadisticasUsuarios, User
 )
 # Session para ejecutar querys a la base de datos
+from sqlalchemy import bindparam, column, insert, table, text, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.sql import Select
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+# Todas las escrituras pasan por el escritor unico
+from database.writer import writer
+# Pool de solo lectura, para las lecturas que viven mas que la request (streaming)
+from database.conect import engine
+# Cache de GET /users/{id}, se invalida en cada UPDATE
+from database.cache import user_cache, MISS
+# Contadores mantenidos por triggers
+from database.stats import TOTAL
+# Argon2 fuera del event loop (pool de procesos)
+from security.hashing import hashing_pool
+
+# Columnas publicas (las de UpsertUser), nunca password ni cv.
+# Las lecturas seleccionan solo estas columnas: filas livianas, sin
+# construir el User completo ni pasar por el identity map de la session.
+COLUMNAS_PUBLICAS = (User.id.label("user_id"), User.name, User.lastname, User.age, User.email)
+COLUMNAS_EXPORT = ("user_id", "name", "lastname", "age", "email")
+# Se arma una sola vez: por request solo cambia el parametro.
+# version no es parte de UpsertUser (model_construct la ignora), es el ETag
+QUERY_POR_ID = select(*COLUMNAS_PUBLICAS, User.version).where(User.id == bindparam("user_id"))
+# If-None-Match: alcanza con la version, sin leer el resto de la fila
+QUERY_VERSION = select(User.version).where(User.id == bindparam("user_id"))
+# filas que se leen del cursor y se escriben juntas en cada chunk
+FILAS_POR_CHUNK = 1000
+# SQLite limita las variables por query (999 en versiones viejas)
+MAX_VARIABLES_SQLITE = 500
+# Tabla virtual FTS5 (migracion v3), solo las columnas que usan las querys
+USER_FTS = table("user_fts", column("rowid"), column("rank"))
+PALABRA = re.compile(r"\w+")
+
+
+def _query_busqueda(columnas: tuple) -> Select:
+    # FTS5 ordenado por relevancia (bm25)
+    return (
+        select(*columnas).select_from(User)
+        .join(USER_FTS, USER_FTS.c.rowid == User.id)
+        .where(text("user_fts MATCH :q"))
+        .order_by(USER_FTS.c.rank)
+        .limit(bindparam("limit"))
+    )
+
+
+QUERY_BUSQUEDA = _query_busqueda(COLUMNAS_PUBLICAS)
+
+
+class Proyeccion(NamedTuple):
+    """Las querys de un ?fields=, armadas una sola vez por conjunto de campos."""
+    columnas: tuple
+    por_id: Select
+    busqueda: Select
+
+
+@lru_cache(maxsize=None)
+def proyeccion(campos: frozenset[str] | None = None) -> Proyeccion:
+    """
+    campos: nombres ya validados contra UpsertUser (None -> todos).
+    Como mucho hay 2^5 conjuntos distintos, el cache no crece sin limite.
+    """
+    if campos is None:
+        columnas = COLUMNAS_PUBLICAS
+    else:
+        # user_id siempre: lo necesitan el cursor y not_found
+        columnas = tuple(columna for columna in COLUMNAS_PUBLICAS if columna.key in campos or columna.key == "user_id")
+    return Proyeccion(
+        columnas=columnas,
+        por_id=select(*columnas, User.version).where(User.id == bindparam("user_id")),
+        busqueda=_query_busqueda(columnas),
+    )
+
 
-from dependencies.dependencie import SessionDep
 class Database():
-    def obtener_usuario(self, user_id: int, limit: int = 5, offset: int = 5) -> UpsertUser:
+    """
+    Las lecturas reciben la session de la request (SessionDep o AsyncSessionDep),
+    que sale del pool de solo lectura. Las escrituras no reciben session:
+    se encolan en el escritor unico (database/writer.py).
+    Los metodos *_async son la variante para endpoints async def.
+    """
+    def obtener_usuario(self, session: Session, user_id: int) -> UpsertUser:
         """
         pre: 
             id: es un entero
         """
-        user = self.get_session_dependecie.get(User, user_id)
+        fila = session.execute(QUERY_POR_ID, {"user_id": user_id}).first()
+        return self._fila_publica(fila)
+
+    async def obtener_usuario_async(self, session: AsyncSession, user_id: int) -> UpsertUser:
+        usuario, _ = await self.obtener_usuario_versionado_async(session, user_id)
+        return usuario
+
+    async def obtener_usuario_versionado_async(self, session: AsyncSession, user_id: int,
+                                               campos: frozenset[str] | None = None) -> tuple[UpsertUser, int]:
+        """
+        campos: los de ?fields= (None -> todos). El usuario completo del
+        cache sirve para cualquier campos; si no esta, se leen solo esas
+        columnas y no se guarda (el cache tiene siempre usuarios completos).
+        """
+        # read-through: primero el cache, si no esta se lee y se guarda
+        guardado = user_cache.get(user_id)
+        if guardado is not MISS:
+            if campos is None:
+                return guardado
+            usuario, version = guardado
+            # copia con solo esos campos marcados como asignados (exclude_unset)
+            return UpsertUser.model_construct(_fields_set=set(campos), **usuario.__dict__), version
+        if campos is not None:
+            fila = (await session.execute(proyeccion(campos).por_id, {"user_id": user_id})).first()
+            return self._fila_publica(fila, campos), fila.version
+        ticket = user_cache.ticket(user_id)
+        fila = (await session.execute(QUERY_POR_ID, {"user_id": user_id})).first()
+        guardado = (self._fila_publica(fila), fila.version)
+        user_cache.set(user_id, guardado, ticket=ticket)
+        return guardado
+
+    async def version_usuario_async(self, session: AsyncSession, user_id: int) -> int:
+        """Para los GET condicionales: la version del cache o un SELECT version."""
+        guardado = user_cache.get(user_id)
+        if guardado is not MISS:
+            return guardado[1]
+        version = (await session.execute(QUERY_VERSION, {"user_id": user_id})).scalar()
+        if version is None:
+            raise HTTPException(detail="Usuario No Encontrado", status_code=404)
+        return version
+
+    async def credenciales_async(self, session: AsyncSession, email: str):
+        """Para el login: Row (user_id, password) del email, o None. password es el hash."""
+        query = select(User.id.label("user_id"), User.password).where(User.email == email)
+        return (await session.execute(query)).first()
+
+    async def obtener_usuarios_async(self, session: AsyncSession, ids: list[int],
+                                     campos: frozenset[str] | None = None) -> UsuariosPorId:
+        """
+        Un solo WHERE id IN (...) por cada bloque de ids (en vez de N session.get).
+        Devuelve en el orden pedido, con None donde el id no existe.
+        """
+        encontrados: dict[int, UpsertUser] = {}
+        unicos = list(dict.fromkeys(ids))
+        columnas = proyeccion(campos).columnas
+        for inicio in range(0, len(unicos), MAX_VARIABLES_SQLITE):
+            bloque = unicos[inicio:inicio + MAX_VARIABLES_SQLITE]
+            filas = (await session.execute(select(*columnas).where(User.id.in_(bloque)))).all()
+            for fila in filas:
+                encontrados[fila.user_id] = self._fila_publica(fila, campos)
+
+        return UsuariosPorId(
+            items=[encontrados.get(user_id) for user_id in ids],
+            not_found=[user_id for user_id in unicos if user_id not in encontrados],
+        )
+
+    async def emails_existentes_async(self, session: AsyncSession, emails: list[str]) -> set[str]:
+        """Los emails que ya tienen usuario, con un WHERE email IN (...) por bloque."""
+        existentes: set[str] = set()
+        for inicio in range(0, len(emails), MAX_VARIABLES_SQLITE):
+            bloque = emails[inicio:inicio + MAX_VARIABLES_SQLITE]
+            existentes.update((await session.execute(select(User.email).where(User.email.in_(bloque)))).scalars())
+        return existentes
+
+    async def buscar_usuarios_async(self, session: AsyncSession, q: str, limit: int,
+                                    campos: frozenset[str] | None = None) -> list[UpsertUser]:
+        """
+        Busca por prefijo en name, lastname y email con el indice FTS5
+        (no recorre la tabla como LIKE '%x%'). Todas las palabras tienen
+        que aparecer: "jho do" encuentra a Jhon Doe.
+        """
+        consulta = expresion_fts(q)
+        if not consulta:
+            return []
+        query = proyeccion(campos).busqueda
+        filas = (await session.execute(query, {"q": consulta, "limit": limit})).all()
+        return [self._fila_publica(fila, campos) for fila in filas]
+
+    async def estadisticas_async(self, session: AsyncSession) -> EstadisticasUsuarios:
+        # lee los contadores de user_stats, no recorre la tabla user
+        filas = (await session.execute(text("SELECT bucket, count FROM user_stats"))).all()
+        conteo = dict(filas)
+        total = conteo.pop(TOTAL, 0)
+        return EstadisticasUsuarios(total=total, by_age=conteo)
+
+    async def listar_usuarios_async(self, session: AsyncSession, cursor: str | None, limit: int,
+                                    campos: frozenset[str] | None = None) -> PaginaUsuarios:
+        """
+        Paginacion por keyset sobre id: WHERE id > ultimo_id ORDER BY id LIMIT n.
+        Usa el indice de la primary key, asi la pagina 10.000 cuesta lo
+        mismo que la primera (con OFFSET SQLite recorre todas las anteriores).
+        """
+        ultimo_id = decodificar_cursor(cursor) if cursor else 0
+        # se pide una fila de mas para saber si hay otra pagina
+        query = select(*proyeccion(campos).columnas).where(User.id > ultimo_id).order_by(User.id).limit(limit + 1)
+        # execute y no exec: con una sola columna (fields=user_id) exec devuelve ints, no filas
+        filas = (await session.execute(query)).all()
+
+        next_cursor = codificar_cursor(filas[limit - 1].user_id) if len(filas) > limit else None
+        return PaginaUsuarios(
+            items=[self._fila_publica(fila, campos) for fila in filas[:limit]],
+            next_cursor=next_cursor,
+        )
+    
+    # Crear no invalida el cache: un id nuevo nunca se guardo (los 404 no
+    # se cachean) y asi un lote no descarta lecturas en curso de otros.
+    def crear_usuario(self, new_user: CreateUser) -> UpsertUser:
+        new_user = new_user.model_copy(update={"password": hashing_pool.hashear_sync(new_user.password)})
+        try:
+            usuario = writer.ejecutar(lambda session: self._insertar_usuario(session, new_user))
+        except IntegrityError:
+            raise email_repetido()
+        return usuario
+
+    async def crear_usuario_async(self, new_user: CreateUser) -> UpsertUser:
+        new_user = new_user.model_copy(update={"password": await hashing_pool.hashear(new_user.password)})
+        try:
+            usuario = await writer.ejecutar_async(lambda session: self._insertar_usuario(session, new_user))
+        except IntegrityError:
+            raise email_repetido()
+        return usuario
+
+    async def crear_usuarios_async(self, new_users: list[CreateUser]) -> list[UpsertUser]:
+        """
+        Inserta todos los usuarios con un solo executemany (INSERT ... RETURNING id)
+        dentro de una sola transaccion del escritor. Devuelve en el mismo orden.
+        El router ya saca los emails repetidos (ver emails_existentes_async);
+        si igual choca uno (otra request lo inserto mientras tanto) no se
+        inserta ninguno: 409.
+        """
+        if not new_users:
+            return []
+        filas = [new_user.model_dump() for new_user in new_users]
+        hashes = await hashing_pool.hashear_lote([fila["password"] for fila in filas])
+        for fila, password in zip(filas, hashes):
+            fila["password"] = password
+        try:
+            ids = await writer.ejecutar_async(lambda session: self._insertar_usuarios(session, filas))
+        except IntegrityError:
+            raise email_repetido()
+        return [
+            UpsertUser(user_id=user_id, name=fila["name"], lastname=fila["lastname"],
+                       age=fila["age"], email=fila["email"])
+            for user_id, fila in zip(ids, filas)
+        ]
+
+    def _insertar_usuarios(self, session: Session, filas: list[dict]) -> list[int]:
+        query = insert(User).returning(User.id, sort_by_parameter_order=True)
+        return list(session.execute(query, filas).scalars())
+
+    async def actualizar_usuario_async(self, user_id: int, cambios: UpdateUser,
+                                       esperadas: list[int] | None = None) -> tuple[UpsertUser, int]:
+        """
+        esperadas: versiones del If-Match (None -> sin condicion).
+        Devuelve el usuario y su version nueva.
+        """
+        valores = cambios.model_dump(exclude_unset=True)
+        if valores.get("password") is not None:
+            valores["password"] = await hashing_pool.hashear(valores["password"])
+        try:
+            resultado = await writer.ejecutar_async(
+                lambda session: self._actualizar_usuario(session, user_id, valores, esperadas)
+            )
+        except IntegrityError:
+            raise email_repetido()
+        # despues del commit: la proxima lectura trae el valor nuevo
+        user_cache.invalidar(user_id)
+        return resultado
+
+    def _actualizar_usuario(self, session: Session, user_id: int, valores: dict,
+                            esperadas: list[int] | None = None) -> tuple[UpsertUser, int]:
+        """
+        Un solo UPDATE ... RETURNING con los campos enviados, en lugar de
+        get -> sqlmodel_update -> commit -> refresh (tres viajes a la base).
+        Concurrencia optimista: con If-Match el UPDATE lleva WHERE version IN
+        (...), si otro lo modifico antes no toca ninguna fila y se responde 412.
+        """
+        if not valores:
+            # PATCH vacio: no hay nada que escribir, se devuelve el usuario tal cual
+            fila = session.execute(QUERY_POR_ID, {"user_id": user_id}).first()
+            usuario = self._fila_publica(fila)
+            if esperadas is not None and fila.version not in esperadas:
+                raise HTTPException(detail="El usuario fue modificado", status_code=412)
+            return usuario, fila.version
+
+        query = update(User).where(User.id == user_id)
+        if esperadas is not None:
+            query = query.where(User.version.in_(esperadas))
+        query = (
+            query.values(**valores, version=User.version + 1)
+            .returning(*COLUMNAS_PUBLICAS, User.version)
+            .execution_options(synchronize_session=False)
+        )
+        fila = session.execute(query).first()
+        if fila is None and esperadas is not None:
+            # no se actualizo: o no existe (404) o cambio de version (412)
+            if session.execute(QUERY_VERSION, {"user_id": user_id}).first() is not None:
+                raise HTTPException(detail="El usuario fue modificado", status_code=412)
+        return self._fila_publica(fila), fila.version
+
+    async def reemplazar_hash_async(self, user_id: int, anterior: str, nuevo: str) -> None:
+        """
+        Rehash en el login. Solo si el hash no cambio mientras tanto (otro
+        login o un PATCH de la contrasena); si el escritor esta lleno se
+        deja para el proximo login, no es motivo para fallar este.
+        """
+        query = (
+            update(User).where(User.id == user_id, User.password == anterior)
+            .values(password=nuevo, version=User.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        try:
+            await writer.ejecutar_async(lambda session: session.execute(query).rowcount)
+        except HTTPException:
+            return
+        user_cache.invalidar(user_id)
+
+    def _insertar_usuario(self, session: Session, new_user: CreateUser) -> UpsertUser:
+        # corre en el hilo del escritor, que hace el commit
+        ## User 
+        user_create = User.model_validate(new_user)
+        session.add(user_create)
+        session.flush()  # asigna el id sin esperar al commit
+        return self._usuario_publico(user_create)
+
+    def exportar_usuarios(self, formato: str) -> Iterator[bytes]:
+        """
+        Generador para StreamingResponse: lee la tabla con yield_per (cursor
+        del lado del servidor) y va entregando bloques ya codificados.
+        Nunca arma la lista completa de filas ni de UpsertUser, la memoria
+        no depende del tamano de la tabla.
+        Abre su propia session porque sigue leyendo despues de que termina
+        el endpoint.
+        """
+        query = (
+            select(*COLUMNAS_PUBLICAS)
+            .order_by(User.id)
+            .execution_options(yield_per=FILAS_POR_CHUNK)
+        )
+        buffer = io.StringIO()
+        writer_csv = csv.writer(buffer)
+        if formato == "csv":
+            writer_csv.writerow(COLUMNAS_EXPORT)
+
+        with Session(engine) as session:
+            for filas in session.execute(query).partitions():
+                if formato == "csv":
+                    writer_csv.writerows(filas)
+                else:
+                    for fila in filas:
+                        buffer.write(json.dumps(dict(zip(COLUMNAS_EXPORT, fila))))
+                        buffer.write("\n")
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+
+    def _fila_publica(self, fila, campos: frozenset[str] | None = None) -> UpsertUser:
+        """
+        fila: Row con las COLUMNAS_PUBLICAS (o las de un ?fields=). Los datos
+        vienen de la base, ya son validos: model_construct evita validarlos
+        otra vez (y no exige los campos que no se pidieron).
+        campos: quedan como los unicos asignados, la respuesta se serializa
+        con exclude_unset (user_id se lee siempre pero solo sale si se pidio).
+        """
+        if fila is None:
+            raise HTTPException(detail="Usuario No Encontrado", status_code=404)
+        if campos is None:
+            return UpsertUser.model_construct(**fila._mapping)
+        return UpsertUser.model_construct(_fields_set=set(campos), **fila._mapping)
+
+    def _usuario_publico(self, user: User | None) -> UpsertUser:
         if user is None:
             raise HTTPException(detail="Usuario No Encontrado", status_code=404)  
-        
+
         return UpsertUser(
             user_id = user.id,
             name = user.name,
             lastname = user.lastname,
-            age = user.age
+            age = user.age,
+            email = user.email,
         )
-    
-    def get_session_dependecie(self) -> SessionDep:
-        return SessionDep
-    
-    def crear_usuario(self, new_user: CreateUser) -> UpsertUser:
-        session = self.get_session_dependecie()
-        ## User 
-        # user_create = User.model_validate(new_user)
-        session.add(new_user)
-        session.commit()
-        session.refresh(user_create)
-        return UpsertUser(
-            user_id = user_create.id,
-            name=user_create.name,
-            lastname = user_create.lastname,
-            age = user_create.age,
-            email = user_create.email,
-        )
\ No newline at end of file
+
+
+def email_repetido() -> HTTPException:
+    # el unico UNIQUE de user (ix_user_email, migracion v6)
+    return HTTPException(detail="Ya existe un usuario con ese email", status_code=409)
+
+
+def expresion_fts(q: str) -> str:
+    # cada palabra entre comillas (el texto del usuario no puede usar la sintaxis
+    # de FTS5: OR, NEAR, columnas) y con * para buscar por prefijo
+    return " ".join(f'"{palabra}"*' for palabra in PALABRA.findall(q))
+
+
+# Cursor opaco de la paginacion: el cliente no deberia depender de que es un id
+def codificar_cursor(ultimo_id: int) -> str:
+    return base64.urlsafe_b64encode(str(ultimo_id).encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str) -> int:
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        return int(base64.urlsafe_b64decode(cursor + relleno).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(detail="Cursor invalido", status_code=400)
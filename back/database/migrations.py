@@ -0,0 +1,155 @@
+# Version del esquema de la base de datos
+"""
+La tabla schema_version guarda un solo numero. Al arrancar cada worker
+solo se lee ese numero (una query, sin reflejar tablas); si es menor que
+SCHEMA_VERSION se corren las migraciones que faltan, en orden, dentro de
+una transaccion BEGIN IMMEDIATE, asi dos workers no migran a la vez.
+
+Para cambiar el esquema: agregar una funcion _vN_... a MIGRACIONES y
+subir SCHEMA_VERSION. Cada migracion tiene que funcionar tanto sobre una
+base vacia (donde la v1 ya crea las tablas con el modelo actual) como
+sobre una base en la version anterior.
+"""
+from typing import Callable
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError
+from sqlmodel import SQLModel
+
+from database.conect import engine, write_engine
+from database.stats import crear_estadisticas
+# Modelos que tiene que conocer SQLModel.metadata
+from schema.user import User
+
+SCHEMA_VERSION = 6
+
+
+def _v1_crear_tablas(conn: Connection) -> None:
+    SQLModel.metadata.create_all(conn)
+
+
+def _v2_indices_minimos(conn: Connection) -> None:
+    # ninguna query filtra ni ordena por estas columnas
+    for indice in ("ix_user_lastname", "ix_user_age", "ix_user_password", "ix_user_cv"):
+        conn.execute(text(f"DROP INDEX IF EXISTS {indice}"))
+
+
+def _v3_busqueda_fts(conn: Connection) -> None:
+    """
+    Indice de texto completo (FTS5) sobre name, lastname y email.
+    content='user': no duplica los textos, los lee de la tabla user.
+    prefix='2 3': indices extra para que "ma*" o "jho*" no recorran todo.
+    Los triggers lo mantienen al dia con cada INSERT/UPDATE/DELETE.
+    Con esto ninguna query usa ix_user_name: se borra.
+    """
+    conn.execute(text("DROP INDEX IF EXISTS ix_user_name"))
+    conn.execute(text(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS user_fts USING fts5("
+        "name, lastname, email, content='user', content_rowid='id', "
+        "prefix='2 3', tokenize='unicode61 remove_diacritics 2')"
+    ))
+    conn.execute(text(
+        "CREATE TRIGGER IF NOT EXISTS user_fts_ai AFTER INSERT ON user BEGIN "
+        "INSERT INTO user_fts (rowid, name, lastname, email) "
+        "VALUES (new.id, new.name, new.lastname, new.email); END"
+    ))
+    conn.execute(text(
+        "CREATE TRIGGER IF NOT EXISTS user_fts_ad AFTER DELETE ON user BEGIN "
+        "INSERT INTO user_fts (user_fts, rowid, name, lastname, email) "
+        "VALUES ('delete', old.id, old.name, old.lastname, old.email); END"
+    ))
+    conn.execute(text(
+        "CREATE TRIGGER IF NOT EXISTS user_fts_au AFTER UPDATE OF name, lastname, email ON user BEGIN "
+        "INSERT INTO user_fts (user_fts, rowid, name, lastname, email) "
+        "VALUES ('delete', old.id, old.name, old.lastname, old.email); "
+        "INSERT INTO user_fts (rowid, name, lastname, email) "
+        "VALUES (new.id, new.name, new.lastname, new.email); END"
+    ))
+    # indexa las filas que ya existian
+    conn.execute(text("INSERT INTO user_fts (user_fts) VALUES ('rebuild')"))
+
+
+def _v4_estadisticas(conn: Connection) -> None:
+    # contadores de usuarios por edad mantenidos por triggers (database/stats.py)
+    crear_estadisticas(conn)
+
+
+def _v5_version_usuario(conn: Connection) -> None:
+    # en una base nueva la v1 ya creo la columna con el modelo actual
+    columnas = {fila.name for fila in conn.execute(text("PRAGMA table_info(user)"))}
+    if "version" not in columnas:
+        conn.execute(text("ALTER TABLE user ADD COLUMN version INTEGER NOT NULL DEFAULT 1"))
+
+
+def _v6_email_unico(conn: Connection) -> None:
+    """
+    El login busca por email: con dos usuarios en el mismo email solo uno
+    podria entrar. Si ya hay repetidos no se elige por nadie cual queda,
+    se frena la migracion para resolverlo a mano.
+    """
+    repetidos = conn.execute(text(
+        "SELECT email FROM user GROUP BY email HAVING count(*) > 1 LIMIT 10"
+    )).scalars().all()
+    if repetidos:
+        raise RuntimeError(f"Hay usuarios con el mismo email, resolverlos antes de migrar: {repetidos}")
+    conn.execute(text("DROP INDEX IF EXISTS ix_user_email"))
+    conn.execute(text("CREATE UNIQUE INDEX ix_user_email ON user (email)"))
+
+
+MIGRACIONES: dict[int, Callable[[Connection], None]] = {
+    1: _v1_crear_tablas,
+    2: _v2_indices_minimos,
+    3: _v3_busqueda_fts,
+    4: _v4_estadisticas,
+    5: _v5_version_usuario,
+    6: _v6_email_unico,
+}
+
+
+def version_actual(conn: Connection) -> int:
+    try:
+        return conn.execute(text("SELECT version FROM schema_version WHERE id = 1")).scalar() or 0
+    except OperationalError:
+        # la tabla todavia no existe
+        return 0
+
+
+def migrar(conn: Connection, desde: int) -> None:
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_version ("
+        "id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER NOT NULL)"
+    ))
+    for version in range(desde + 1, SCHEMA_VERSION + 1):
+        MIGRACIONES[version](conn)
+    conn.execute(
+        text("INSERT INTO schema_version (id, version) VALUES (1, :version) "
+             "ON CONFLICT (id) DO UPDATE SET version = excluded.version"),
+        {"version": SCHEMA_VERSION},
+    )
+
+
+def asegurar_esquema(lectura: Engine = engine, escritura: Engine = write_engine) -> int:
+    """
+    Camino rapido: leer la version con una conexion de solo lectura.
+    Solo si difiere se toma el lock de escritura y se migra.
+    """
+    try:
+        with lectura.connect() as conn:
+            version = version_actual(conn)
+    except OperationalError:
+        # el archivo todavia no existe (solo lectura no lo puede crear)
+        version = 0
+    if version == SCHEMA_VERSION:
+        return version
+    if version > SCHEMA_VERSION:
+        raise RuntimeError(
+            f"La base de datos esta en la version {version}, este codigo solo conoce hasta {SCHEMA_VERSION}"
+        )
+
+    with escritura.begin() as conn:
+        # otro worker pudo migrar mientras esperabamos el lock
+        version = version_actual(conn)
+        if version < SCHEMA_VERSION:
+            migrar(conn, version)
+    return SCHEMA_VERSION
@@ -0,0 +1,107 @@
+# Estadisticas de usuarios mantenidas por triggers
+"""
+user_stats tiene una fila por bucket ('total' y uno por rango de edad)
+con su contador. Los triggers de user la actualizan en cada INSERT,
+DELETE y UPDATE de age, dentro de la misma transaccion que la escritura,
+asi GET /admin/users/stats lee ocho filas sin importar cuantos usuarios
+haya.
+
+Revisar que los contadores coinciden con la tabla (desde back/):
+    python -m database.stats          # solo reporta el drift
+    python -m database.stats --fix    # y recalcula desde cero
+"""
+import argparse
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+TOTAL = "total"
+# (bucket, edad maxima exclusiva); None = sin limite
+RANGOS_EDAD = (("0-17", 18), ("18-24", 25), ("25-34", 35), ("35-49", 50), ("50-64", 65), ("65+", None))
+SIN_EDAD = "unknown"
+BUCKETS = (TOTAL,) + tuple(nombre for nombre, _ in RANGOS_EDAD) + (SIN_EDAD,)
+
+
+def bucket_sql(columna: str) -> str:
+    """Expresion CASE que da el bucket de una edad (new.age, old.age o age)."""
+    casos = " ".join(
+        f"WHEN {columna} < {hasta} THEN '{nombre}'" for nombre, hasta in RANGOS_EDAD if hasta is not None
+    )
+    return f"(CASE WHEN {columna} IS NULL THEN '{SIN_EDAD}' {casos} ELSE '{RANGOS_EDAD[-1][0]}' END)"
+
+
+def crear_estadisticas(conn: Connection) -> None:
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS user_stats (bucket TEXT PRIMARY KEY, count INTEGER NOT NULL DEFAULT 0)"
+    ))
+    conn.execute(text(
+        "CREATE TRIGGER IF NOT EXISTS user_stats_ai AFTER INSERT ON user BEGIN "
+        f"UPDATE user_stats SET count = count + 1 WHERE bucket IN ('{TOTAL}', {bucket_sql('new.age')}); END"
+    ))
+    conn.execute(text(
+        "CREATE TRIGGER IF NOT EXISTS user_stats_ad AFTER DELETE ON user BEGIN "
+        f"UPDATE user_stats SET count = count - 1 WHERE bucket IN ('{TOTAL}', {bucket_sql('old.age')}); END"
+    ))
+    conn.execute(text(
+        "CREATE TRIGGER IF NOT EXISTS user_stats_au AFTER UPDATE OF age ON user "
+        f"WHEN {bucket_sql('old.age')} != {bucket_sql('new.age')} BEGIN "
+        f"UPDATE user_stats SET count = count - 1 WHERE bucket = {bucket_sql('old.age')}; "
+        f"UPDATE user_stats SET count = count + 1 WHERE bucket = {bucket_sql('new.age')}; END"
+    ))
+    recalcular(conn)
+
+
+def contar_desde_cero(conn: Connection) -> dict[str, int]:
+    # recorre toda la tabla: solo para la migracion y el chequeo
+    conteo = dict.fromkeys(BUCKETS, 0)
+    filas = conn.execute(text(f"SELECT {bucket_sql('age')} AS bucket, COUNT(*) FROM user GROUP BY bucket"))
+    for bucket, cantidad in filas:
+        conteo[bucket] = cantidad
+    conteo[TOTAL] = sum(conteo[bucket] for bucket in BUCKETS if bucket != TOTAL)
+    return conteo
+
+
+def recalcular(conn: Connection) -> dict[str, int]:
+    conteo = contar_desde_cero(conn)
+    conn.execute(
+        text("INSERT INTO user_stats (bucket, count) VALUES (:bucket, :count) "
+             "ON CONFLICT (bucket) DO UPDATE SET count = excluded.count"),
+        [{"bucket": bucket, "count": cantidad} for bucket, cantidad in conteo.items()],
+    )
+    return conteo
+
+
+def leer_contadores(conn: Connection) -> dict[str, int]:
+    conteo = dict.fromkeys(BUCKETS, 0)
+    conteo.update(conn.execute(text("SELECT bucket, count FROM user_stats")).all())
+    return conteo
+
+
+def drift(guardado: dict[str, int], real: dict[str, int]) -> dict[str, int]:
+    """Buckets donde el contador no coincide: bucket -> guardado - real."""
+    return {bucket: guardado[bucket] - real[bucket] for bucket in BUCKETS if guardado[bucket] != real[bucket]}
+
+
+def main() -> None:
+    from database.conect import write_engine
+
+    parser = argparse.ArgumentParser(description="Compara user_stats con un conteo desde cero")
+    parser.add_argument("--fix", action="store_true", help="recalcular los contadores si hay drift")
+    args = parser.parse_args()
+
+    # BEGIN IMMEDIATE: nadie escribe mientras se compara
+    with write_engine.begin() as conn:
+        guardado = leer_contadores(conn)
+        real = contar_desde_cero(conn)
+        diferencias = drift(guardado, real)
+        for bucket in BUCKETS:
+            marca = f"  drift {diferencias[bucket]:+d}" if bucket in diferencias else ""
+            print(f"{bucket:>8}: guardado {guardado[bucket]:>10}  real {real[bucket]:>10}{marca}")
+        if diferencias and args.fix:
+            recalcular(conn)
+            print("contadores recalculados")
+    raise SystemExit(1 if diferencias and not args.fix else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+# Escritor unico para SQLite
+"""
+SQLite solo permite un escritor a la vez. En lugar de que cada request
+abra su propia Session y compita por el lock (los "database is locked"),
+todas las operaciones que modifican la base se encolan aqui y un solo
+hilo las ejecuta, en orden, sobre la conexion de write_engine.
+
+Una operacion es una funcion que recibe la Session del escritor y
+devuelve un resultado; el escritor hace commit (o rollback si falla)
+y entrega el resultado o la excepcion al que la encolo.
+
+Con group commit (WRITER_GROUP_COMMIT) el escritor junta las operaciones
+que llegan dentro de una ventana corta (WRITER_GROUP_WINDOW_MS o
+WRITER_GROUP_MAX_ROWS) en una sola transaccion: un solo fsync para todo
+el grupo. Cada operacion corre en su propio SAVEPOINT, asi si una falla
+solo se deshace esa y las demas se confirman igual.
+
+Las lecturas no pasan por aqui, usan el pool de solo lectura de conect.py.
+"""
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, TypeVar
+
+from fastapi import HTTPException
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+
+from config.settings import (
+    WRITER_QUEUE_SIZE, WRITER_GROUP_COMMIT,
+    WRITER_GROUP_WINDOW_MS, WRITER_GROUP_MAX_ROWS,
+)
+from database.conect import write_engine
+
+T = TypeVar("T")
+Operacion = Callable[[Session], T]
+
+_PARAR = object()
+
+
+class WriterMetrics():
+    """
+    Contadores del escritor: profundidad de la cola y tiempo que cada
+    operacion espero en la cola antes de ejecutarse (contencion).
+    """
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.ejecutadas = 0
+        self.fallidas = 0
+        self.rechazadas = 0
+        self.espera_total = 0.0
+        self.espera_maxima = 0.0
+        self.ejecucion_total = 0.0
+        self.transacciones = 0
+
+    def registrar(self, esperas: list[float], ejecucion: float, errores: int) -> None:
+        # una llamada por transaccion (grupo de una o mas operaciones)
+        with self._lock:
+            self.transacciones += 1
+            self.ejecutadas += len(esperas)
+            self.fallidas += errores
+            self.espera_total += sum(esperas)
+            self.espera_maxima = max(self.espera_maxima, *esperas)
+            self.ejecucion_total += ejecucion
+
+    def rechazar(self) -> None:
+        with self._lock:
+            self.rechazadas += 1
+
+    def snapshot(self, profundidad: int) -> dict[str, float | int]:
+        with self._lock:
+            ejecutadas = self.ejecutadas or 1
+            return {
+                "queue_depth": profundidad,
+                "executed": self.ejecutadas,
+                "transactions": self.transacciones,
+                "avg_group_size": self.ejecutadas / (self.transacciones or 1),
+                "failed": self.fallidas,
+                "rejected": self.rechazadas,
+                "wait_avg_ms": self.espera_total / ejecutadas * 1000,
+                "wait_max_ms": self.espera_maxima * 1000,
+                "exec_avg_ms": self.ejecucion_total / (self.transacciones or 1) * 1000,
+            }
+
+
+class SingleWriter():
+    def __init__(self, engine: Engine, max_queue: int, group_commit: bool = False,
+                 group_window_ms: float = 2, group_max_rows: int = 128) -> None:
+        self._engine = engine
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self.group_commit = group_commit
+        self.group_window = group_window_ms / 1000
+        self.group_max_rows = group_max_rows
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+        self.metricas = WriterMetrics()
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+                self._thread.start()
+
+    def stop(self) -> None:
+        """Termina lo que ya esta encolado y detiene el hilo."""
+        with self._start_lock:
+            if self._thread is None:
+                return
+            self._queue.put(_PARAR)
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, operacion: Operacion[T]) -> "Future[T]":
+        """
+        Encola la operacion sin bloquear. Si la cola esta llena responde
+        503 en vez de dejar crecer la latencia sin limite.
+        """
+        self.start()
+        future: Future = Future()
+        try:
+            self._queue.put_nowait((operacion, future, time.perf_counter()))
+        except queue.Full:
+            self.metricas.rechazar()
+            raise HTTPException(status_code=503, detail="Demasiadas escrituras pendientes",
+                                headers={"Retry-After": "1"})
+        return future
+
+    def ejecutar(self, operacion: Operacion[T]) -> T:
+        """Para codigo sincrono: espera el resultado en el hilo actual."""
+        return self.submit(operacion).result()
+
+    async def ejecutar_async(self, operacion: Operacion[T]) -> T:
+        """Para endpoints async: espera el resultado sin bloquear el event loop."""
+        return await asyncio.wrap_future(self.submit(operacion))
+
+    def profundidad(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self) -> dict[str, float | int]:
+        return self.metricas.snapshot(self.profundidad())
+
+    def _run(self) -> None:
+        with Session(self._engine) as session:
+            parar = False
+            while not parar:
+                grupo, parar = self._siguiente_grupo()
+                if grupo:
+                    self._ejecutar_grupo(session, grupo)
+
+    def _siguiente_grupo(self) -> tuple[list, bool]:
+        """Espera la primera operacion y, con group commit, junta las que lleguen en la ventana."""
+        item = self._queue.get()
+        if item is _PARAR:
+            return [], True
+        grupo = [item]
+        if not self.group_commit:
+            return grupo, False
+
+        limite = time.perf_counter() + self.group_window
+        while len(grupo) < self.group_max_rows:
+            restante = limite - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=restante) if restante > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _PARAR:
+                return grupo, True
+            grupo.append(item)
+        return grupo, False
+
+    def _ejecutar_grupo(self, session: Session, grupo: list) -> None:
+        inicio = time.perf_counter()
+        pendientes = [(operacion, future) for operacion, future, _ in grupo
+                      if future.set_running_or_notify_cancel()]
+        resultados = []
+        errores = 0
+        try:
+            for operacion, future in pendientes:
+                if len(pendientes) == 1:
+                    resultados.append((future, operacion(session)))
+                    continue
+                savepoint = session.begin_nested()
+                try:
+                    resultado = operacion(session)
+                    savepoint.commit()
+                except Exception as error:
+                    savepoint.rollback()
+                    future.set_exception(error)
+                    errores += 1
+                else:
+                    resultados.append((future, resultado))
+            session.commit()
+        except Exception as error:
+            # fallo el commit del grupo: nada quedo guardado
+            session.rollback()
+            for _, future in pendientes:
+                if not future.done():
+                    future.set_exception(error)
+            errores = len(pendientes)
+        else:
+            for future, resultado in resultados:
+                future.set_result(resultado)
+        finally:
+            session.expunge_all()
+            esperas = [inicio - encolada for _, _, encolada in grupo]
+            self.metricas.registrar(esperas, time.perf_counter() - inicio, errores)
+
+
+writer = SingleWriter(
+    write_engine, WRITER_QUEUE_SIZE, group_commit=WRITER_GROUP_COMMIT,
+    group_window_ms=WRITER_GROUP_WINDOW_MS, group_max_rows=WRITER_GROUP_MAX_ROWS,
+)
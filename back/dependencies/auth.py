@@ -0,0 +1,103 @@
+# Autenticacion con tokens JWT (OAuth2 password + Bearer)
+"""
+El flujo de guia_basica_usuario/seguridad_9/4_auth.py: POST /token
+devuelve un JWT firmado con sub="user:<id>" y usuario_actual lo verifica
+en cada request.
+
+Verificar la firma y buscar al usuario en cada request es lo que mas
+cuesta en un endpoint autenticado, asi que:
+* token_cache: sha256 del token -> user_id de los tokens que ya se
+  verificaron. Cada entrada vence en el exp del token, nunca despues.
+  Se guarda el hash y no el token, por si alguien lee la memoria.
+* el usuario (el principal) sale de obtener_usuario_async, que lee del
+  user_cache: se invalida en cada escritura, asi un cambio de email o
+  un usuario borrado se ve en la siguiente request.
+"""
+import hashlib
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Annotated
+
+import jwt
+from fastapi import Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordBearer
+from jwt.exceptions import InvalidTokenError
+
+from config.settings import (
+    SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES,
+    AUTH_TOKEN_CACHE_ENABLED, AUTH_TOKEN_CACHE_SIZE, ADMIN_USER_IDS,
+)
+from database.cache import LRUCache, MISS
+from database.dbase import Database
+from dependencies.dependencie import AsyncSessionDep
+from schema.user import Token, UpsertUser
+
+database_instance = Database()
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+# sha256(token) -> user_id
+token_cache = LRUCache(AUTH_TOKEN_CACHE_SIZE, ACCESS_TOKEN_EXPIRE_MINUTES * 60, enabled=AUTH_TOKEN_CACHE_ENABLED)
+# el sub identifica a un usuario en toda la aplicacion (ver 4_auth.py)
+PREFIJO_SUB = "user:"
+
+
+def credenciales_invalidas() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="No se pudieron validar las credenciales",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def crear_token(user_id: int, expires_delta: timedelta | None = None) -> Token:
+    expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+    access_token = jwt.encode({"sub": f"{PREFIJO_SUB}{user_id}", "exp": expire}, SECRET_KEY, algorithm=ALGORITHM)
+    return Token(access_token=access_token, token_type="bearer")
+
+
+def verificar_token(token: str) -> int:
+    """Devuelve el user_id del token; 401 si es invalido o vencio."""
+    clave = hashlib.sha256(token.encode()).digest()
+    user_id = token_cache.get(clave)
+    if user_id is not MISS:
+        return user_id
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        sub = payload.get("sub") or ""
+        user_id = int(sub.removeprefix(PREFIJO_SUB)) if sub.startswith(PREFIJO_SUB) else None
+    except (InvalidTokenError, ValueError):
+        raise credenciales_invalidas()
+    if user_id is None:
+        raise credenciales_invalidas()
+    # hasta el exp del token (jwt.decode ya rechazo los vencidos)
+    restante = payload.get("exp", 0) - time.time()
+    if restante > 0:
+        token_cache.set(clave, user_id, ttl=restante)
+    return user_id
+
+
+async def usuario_actual(session: AsyncSessionDep, token: str = Depends(oauth2_scheme)) -> UpsertUser:
+    user_id = verificar_token(token)
+    try:
+        return await database_instance.obtener_usuario_async(session, user_id)
+    except HTTPException:
+        # el token es valido pero el usuario ya no existe
+        raise credenciales_invalidas()
+
+
+UsuarioActual = Annotated[UpsertUser, Depends(usuario_actual)]
+
+
+async def usuario_admin(usuario: UsuarioActual) -> UpsertUser:
+    """
+    Cualquiera consigue un token (POST /users/ es abierto), asi que para
+    /admin ademas el usuario tiene que estar en ADMIN_USER_IDS.
+    """
+    if usuario.user_id not in ADMIN_USER_IDS:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Solo administradores")
+    return usuario
+
+
+def exigir_propietario(usuario: UpsertUser, user_id: int) -> None:
+    """403 si el usuario del token no es el dueno del recurso."""
+    if usuario.user_id != user_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Solo el propio usuario puede modificarlo")
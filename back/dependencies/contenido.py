@@ -0,0 +1,52 @@
+# Cuerpo de la request en JSON o MessagePack (segun Content-Type)
+import json
+from typing import Any
+
+from fastapi import HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+
+from responses.serializacion import MEDIA_TYPES_MSGPACK, MEDIA_TYPE_JSON, adaptador, msgpack
+
+
+async def leer_cuerpo(request: Request) -> Any:
+    """Decodifica el body a objetos de Python, sin validar."""
+    content_type = request.headers.get("content-type", MEDIA_TYPE_JSON).split(";")[0].strip()
+    crudo = await request.body()
+    try:
+        if content_type in MEDIA_TYPES_MSGPACK:
+            if msgpack is None:
+                raise HTTPException(detail="MessagePack no esta disponible", status_code=415)
+            return msgpack.unpackb(crudo)
+        return json.loads(crudo)
+    except ValueError:
+        # JSON o MessagePack mal formado (los dos decoders levantan ValueError)
+        raise RequestValidationError([{
+            "type": "body_decode_error", "loc": ("body",), "msg": f"Body invalido para {content_type}",
+        }])
+
+
+def cuerpo(tipo: Any):
+    """
+    Dependencia que valida el body contra `tipo`, venga en JSON o MessagePack.
+    Uso: new_user: CreateUser = Depends(cuerpo(CreateUser))
+    """
+    async def _validar(request: Request) -> Any:
+        datos = await leer_cuerpo(request)
+        try:
+            return adaptador(tipo).validate_python(datos)
+        except ValidationError as error:
+            raise RequestValidationError([
+                {**detalle, "loc": ("body", *detalle["loc"])}
+                for detalle in error.errors(include_url=False, include_context=False, include_input=False)
+            ])
+    return _validar
+
+
+def esquema_cuerpo(tipo: Any) -> dict:
+    # para /docs: el body ya no lo declara Body(), se describe a mano
+    esquema = adaptador(tipo).json_schema()
+    return {"requestBody": {"required": True, "content": {
+        MEDIA_TYPE_JSON: {"schema": esquema},
+        MEDIA_TYPES_MSGPACK[0]: {"schema": esquema},
+    }}}
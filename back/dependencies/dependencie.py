@@ -1,9 +1,11 @@
 # session para gestionar la base de datos
-from database.conect import get_session
+from database.conect import get_session, get_async_session
 from fastapi import Depends
 from typing import Annotated
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 SessionDep = Annotated[Session, Depends(get_session)]
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_session)]
 
-# Instancia de la base de datos 
\ No newline at end of file
+# Instancia de la base de datos 
@@ -1,12 +1,61 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 # Rutas o Endpoints de nuestro servidor
-from routers import users
-from database.conect import create_db_and_tables
+from routers import users, admin, auth
+from database.conect import async_engine
+from database.migrations import asegurar_esquema
+from database.writer import writer
+from security.hashing import hashing_pool
+from middleware.compresion import GZipMiddleware
+from middleware.rate_limit import RateLimitMiddleware, Regla
+from config.settings import (
+    SECRET_KEY,
+    GZIP_ENABLED, GZIP_MIN_SIZE, GZIP_LEVEL, GZIP_CONTENT_TYPES, GZIP_CACHE_SIZE,
+    RATE_LIMIT_ENABLED, RATE_LIMIT_WRITES_PER_SECOND, RATE_LIMIT_WRITES_BURST,
+    RATE_LIMIT_LOGIN_PER_SECOND, RATE_LIMIT_LOGIN_BURST,
+    RATE_LIMIT_UPLOADS_PER_SECOND, RATE_LIMIT_UPLOADS_BURST,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # sin una clave compartida los tokens fallarian al azar entre workers
+    if not SECRET_KEY:
+        raise RuntimeError("Falta SECRET_KEY en el entorno (.env), generarla con: openssl rand -hex 32")
+    # Al arrancar el worker: revisar la version del esquema (y migrar si hace falta)
+    asegurar_esquema()
+    writer.start()
+    hashing_pool.start()
+    yield
+    # Al apagar: terminar las escrituras pendientes y cerrar conexiones
+    writer.stop()
+    hashing_pool.stop()
+    await async_engine.dispose()
+
 
-app = FastAPI()
-create_db_and_tables()
+app = FastAPI(lifespan=lifespan)
+# Middlewares
+if GZIP_ENABLED:
+    app.add_middleware(
+        GZipMiddleware, minimum_size=GZIP_MIN_SIZE, level=GZIP_LEVEL,
+        content_types=GZIP_CONTENT_TYPES, cache_size=GZIP_CACHE_SIZE,
+    )
+# el ultimo que se agrega corre primero: una request rechazada no llega a gzip
+if RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware, reglas=[
+        Regla("POST", "/users/", RATE_LIMIT_WRITES_PER_SECOND, RATE_LIMIT_WRITES_BURST),
+        Regla("POST", "/users/batch", RATE_LIMIT_WRITES_PER_SECOND, RATE_LIMIT_WRITES_BURST),
+        Regla("PATCH", "/users/*", RATE_LIMIT_WRITES_PER_SECOND, RATE_LIMIT_WRITES_BURST),
+        # POST /users/{id}/cv: las exactas de arriba se buscan antes que este prefijo
+        Regla("POST", "/users/*", RATE_LIMIT_UPLOADS_PER_SECOND, RATE_LIMIT_UPLOADS_BURST),
+        # por IP: antes del login no hay usuario
+        Regla("POST", "/token", RATE_LIMIT_LOGIN_PER_SECOND, RATE_LIMIT_LOGIN_BURST, claves=("ip",)),
+    ])
 # Rutas
+app.include_router(auth.router)
 app.include_router(users.router)
+app.include_router(admin.router)
 
 @app.get(path="/main", status_code=200)
 def main():
@@ -0,0 +1,128 @@
+# Middleware de compresion gzip
+"""
+Comprime las respuestas cuando el cliente manda "Accept-Encoding: gzip",
+el Content-Type esta en la lista configurada y el cuerpo supera el
+tamano minimo (en respuestas chicas gzip agrega mas de lo que ahorra).
+
+* Respuestas que ya traen Content-Encoding no se tocan.
+* Respuestas en streaming (StreamingResponse, el export) se comprimen
+  chunk por chunk con un flush en cada uno, asi el cliente sigue
+  recibiendo datos a medida que se generan. text/event-stream no se
+  comprime: los eventos tienen que llegar enteros y en el momento.
+* Respuestas completas: el resultado se guarda en un cache chico por
+  hash del cuerpo; la misma respuesta (por ejemplo un usuario que sale
+  del cache de usuarios) no se vuelve a comprimir.
+
+Es un middleware ASGI puro (no BaseHTTPMiddleware) para no cambiar la
+forma en que se envian los cuerpos en streaming.
+"""
+import gzip
+import hashlib
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from database.cache import LRUCache, MISS
+
+NO_COMPRIMIR_STREAMING = ("text/event-stream",)
+# mas grande que esto no se guarda en el cache de respuestas comprimidas
+MAX_CUERPO_CACHE = 256 * 1024
+
+
+class GZipMiddleware():
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, level: int = 5,
+                 content_types: tuple[str, ...] = ("application/json",), cache_size: int = 256) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+        self.content_types = content_types
+        self.cache = LRUCache(cache_size, ttl=300, enabled=cache_size > 0)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or "gzip" not in Headers(scope=scope).get("accept-encoding", ""):
+            await self.app(scope, receive, send)
+            return
+        await _Respuesta(self, send).responder(scope, receive)
+
+    def comprimir(self, cuerpo: bytes) -> bytes:
+        if len(cuerpo) > MAX_CUERPO_CACHE:
+            return gzip.compress(cuerpo, self.level, mtime=0)
+        clave = (hashlib.blake2b(cuerpo, digest_size=16).digest(), self.level)
+        comprimido = self.cache.get(clave)
+        if comprimido is MISS:
+            # mtime=0: la misma entrada da siempre los mismos bytes
+            comprimido = gzip.compress(cuerpo, self.level, mtime=0)
+            self.cache.set(clave, comprimido)
+        return comprimido
+
+
+class _Respuesta():
+    """Estado de una sola respuesta: decide en el primer chunk del body."""
+    def __init__(self, middleware: GZipMiddleware, send: Send) -> None:
+        self.middleware = middleware
+        self.send = send
+        self.inicio: Message | None = None
+        self.modo: str | None = None  # "pasar", "completa" o "streaming"
+        self.compresor = None
+
+    async def responder(self, scope: Scope, receive: Receive) -> None:
+        await self.middleware.app(scope, receive, self.enviar)
+
+    async def enviar(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # se retiene hasta ver el primer chunk del body
+            self.inicio = message
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        if self.modo is None:
+            self.modo = self.elegir_modo(message)
+            if self.modo == "pasar":
+                await self.send(self.inicio)
+        if self.modo == "pasar":
+            await self.send(message)
+        elif self.modo == "completa":
+            await self.enviar_completa(message)
+        else:
+            await self.enviar_chunk(message)
+
+    def elegir_modo(self, message: Message) -> str:
+        headers = Headers(raw=self.inicio["headers"])
+        content_type = headers.get("content-type", "").split(";")[0].strip()
+        if "content-encoding" in headers or content_type not in self.middleware.content_types:
+            return "pasar"
+        if message.get("more_body", False):
+            return "pasar" if content_type in NO_COMPRIMIR_STREAMING else "streaming"
+        if len(message.get("body", b"")) < self.middleware.minimum_size:
+            return "pasar"
+        return "completa"
+
+    def headers_comprimidos(self) -> MutableHeaders:
+        headers = MutableHeaders(raw=self.inicio["headers"])
+        headers["Content-Encoding"] = "gzip"
+        headers.add_vary_header("Accept-Encoding")
+        return headers
+
+    async def enviar_completa(self, message: Message) -> None:
+        comprimido = self.middleware.comprimir(message["body"])
+        headers = self.headers_comprimidos()
+        headers["Content-Length"] = str(len(comprimido))
+        await self.send(self.inicio)
+        await self.send({"type": "http.response.body", "body": comprimido})
+
+    async def enviar_chunk(self, message: Message) -> None:
+        if self.compresor is None:
+            headers = self.headers_comprimidos()
+            # el largo final no se conoce: chunked
+            del headers["Content-Length"]
+            await self.send(self.inicio)
+            # wbits 16+: formato gzip (no zlib crudo)
+            self.compresor = zlib.compressobj(self.middleware.level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+        mas = message.get("more_body", False)
+        cuerpo = self.compresor.compress(message.get("body", b""))
+        cuerpo += self.compresor.flush(zlib.Z_SYNC_FLUSH if mas else zlib.Z_FINISH)
+        await self.send({"type": "http.response.body", "body": cuerpo, "more_body": mas})
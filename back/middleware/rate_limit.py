@@ -0,0 +1,183 @@
+# Middleware de rate limiting (token bucket)
+"""
+Cada cliente tiene un bucket por regla: se llena a `por_segundo` fichas
+por segundo hasta `rafaga`, y cada request gasta una. Sin fichas se
+responde 429 con Retry-After (los segundos hasta la proxima ficha), antes
+de llegar al endpoint: una rafaga de POST /users/ no se convierte en una
+cola de escrituras en SQLite.
+
+El cliente se identifica, segun el orden de `claves` de la regla, por:
+* "user": el user_id de un Bearer token que ya esta en token_cache
+  (verificado). Un token que no se verifico todavia cuenta por su IP,
+  asi no se puede esquivar el limite inventando tokens.
+* "api_key": el header X-API-Key. Solo tiene sentido si un proxy ya lo
+  valido; si no, cada valor inventado seria un bucket nuevo.
+* "ip": la IP del cliente (scope["client"]).
+
+Los buckets viven en una tabla partida en shards, cada uno con su lock:
+dos requests de clientes distintos casi nunca esperan el mismo lock.
+Las entradas que no se usan hace idle_seconds se borran de a poco (un
+shard por vez); si idle_seconds >= rafaga / por_segundo el bucket ya
+estaba lleno, borrarlo no cambia nada.
+
+Los contadores son por proceso: con N workers el limite real es N veces
+el configurado.
+"""
+import hashlib
+import json
+import math
+import threading
+import time
+from dataclasses import dataclass
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from config.settings import RATE_LIMIT_SHARDS, RATE_LIMIT_IDLE_SECONDS
+from database.cache import MISS
+from dependencies.auth import token_cache
+
+
+@dataclass(frozen=True)
+class Regla():
+    metodo: str
+    path: str  # exacto, o prefijo si termina en "*"
+    por_segundo: float
+    rafaga: int
+    claves: tuple[str, ...] = ("user", "ip")
+
+
+class _Shard():
+    __slots__ = ("lock", "buckets", "ultima_limpieza", "permitidas", "rechazadas", "desalojadas")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        # clave -> [fichas, ultimo uso]
+        self.buckets: dict[tuple, list[float]] = {}
+        self.ultima_limpieza = time.monotonic()
+        # contadores del shard, se suman en stats()
+        self.permitidas = 0
+        self.rechazadas = 0
+        self.desalojadas = 0
+
+
+class TokenBuckets():
+    def __init__(self, shards: int = 64, idle_seconds: float = 300) -> None:
+        # potencia de 2: el shard sale de hash(clave) & mascara
+        cantidad = 1 << max(shards - 1, 0).bit_length()
+        self._shards = [_Shard() for _ in range(cantidad)]
+        self._mascara = cantidad - 1
+        self.idle_seconds = idle_seconds
+
+    def tomar(self, clave: tuple, por_segundo: float, rafaga: int) -> float:
+        """Gasta una ficha. Devuelve 0 si se permite, o los segundos a esperar."""
+        ahora = time.monotonic()
+        shard = self._shards[hash(clave) & self._mascara]
+        with shard.lock:
+            bucket = shard.buckets.get(clave)
+            if bucket is None:
+                fichas = rafaga
+                bucket = shard.buckets[clave] = [fichas, ahora]
+            else:
+                fichas = min(rafaga, bucket[0] + (ahora - bucket[1]) * por_segundo)
+            bucket[1] = ahora
+            if fichas >= 1:
+                bucket[0] = fichas - 1
+                shard.permitidas += 1
+                espera = 0.0
+            else:
+                bucket[0] = fichas
+                shard.rechazadas += 1
+                espera = (1 - fichas) / por_segundo
+            if ahora - shard.ultima_limpieza > self.idle_seconds:
+                self._limpiar(shard, ahora)
+        return espera
+
+    def _limpiar(self, shard: _Shard, ahora: float) -> None:
+        # con el lock del shard tomado
+        viejas = [clave for clave, (_, uso) in shard.buckets.items() if ahora - uso > self.idle_seconds]
+        for clave in viejas:
+            del shard.buckets[clave]
+        shard.ultima_limpieza = ahora
+        shard.desalojadas += len(viejas)
+
+    def __len__(self) -> int:
+        return sum(len(shard.buckets) for shard in self._shards)
+
+    def stats(self) -> dict[str, int | float]:
+        totales = {"keys": 0, "allowed": 0, "rejected": 0, "evicted": 0}
+        for shard in self._shards:
+            with shard.lock:
+                totales["keys"] += len(shard.buckets)
+                totales["allowed"] += shard.permitidas
+                totales["rejected"] += shard.rechazadas
+                totales["evicted"] += shard.desalojadas
+        return {"shards": len(self._shards), **totales, "idle_seconds": self.idle_seconds}
+
+
+# la de la app (GET /admin/metrics/rate-limit)
+rate_limit_buckets = TokenBuckets(RATE_LIMIT_SHARDS, RATE_LIMIT_IDLE_SECONDS)
+
+
+def identificar(scope: Scope, claves: tuple[str, ...]) -> tuple:
+    """Clave del cliente segun la primera de `claves` que se pueda usar."""
+    headers = {}
+    for nombre, valor in scope["headers"]:
+        if nombre == b"authorization" or nombre == b"x-api-key":
+            headers[nombre] = valor
+    for tipo in claves:
+        if tipo == "user":
+            autorizacion = headers.get(b"authorization", b"")
+            if autorizacion[:7].lower() == b"bearer ":
+                user_id = token_cache.get(hashlib.sha256(autorizacion[7:]).digest())
+                if user_id is not MISS:
+                    return ("user", user_id)
+        elif tipo == "api_key" and b"x-api-key" in headers:
+            return ("api_key", headers[b"x-api-key"])
+        elif tipo == "ip" and scope.get("client"):
+            return ("ip", scope["client"][0])
+    return ("ip", None)
+
+
+class RateLimitMiddleware():
+    def __init__(self, app: ASGIApp, reglas: list[Regla], buckets: TokenBuckets | None = None) -> None:
+        self.app = app
+        self.buckets = buckets or rate_limit_buckets
+        # exactas: un lookup por request; prefijos: pocas, se recorren
+        self.exactas = {(regla.metodo, regla.path): regla for regla in reglas if not regla.path.endswith("*")}
+        self.prefijos = [regla for regla in reglas if regla.path.endswith("*")]
+
+    def regla(self, metodo: str, path: str) -> Regla | None:
+        regla = self.exactas.get((metodo, path))
+        if regla is not None:
+            return regla
+        for regla in self.prefijos:
+            if regla.metodo == metodo and path.startswith(regla.path[:-1]):
+                return regla
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        regla = self.regla(scope["method"], scope["path"])
+        if regla is None:
+            await self.app(scope, receive, send)
+            return
+
+        # la regla va en la clave: cada ruta tiene su propio bucket
+        clave = (regla.metodo, regla.path, *identificar(scope, regla.claves))
+        espera = self.buckets.tomar(clave, regla.por_segundo, regla.rafaga)
+        if not espera:
+            await self.app(scope, receive, send)
+            return
+        cuerpo = json.dumps({"detail": "Demasiadas requests, intente mas tarde"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(cuerpo)).encode()),
+                (b"retry-after", str(math.ceil(espera)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": cuerpo})
@@ -0,0 +1,35 @@
+# ETag de un usuario a partir de su columna version
+"""
+El ETag es la version del registro, no un hash de los bytes: la misma
+version se sirve en JSON, MessagePack o gzip, por eso es debil (W/).
+Asi un If-None-Match se contesta sabiendo solo la version, sin armar
+ni serializar el UpsertUser.
+
+Para If-Match se compara igual (ignorando el W/): lo que importa es que
+el cliente edito la misma version que esta guardada.
+"""
+
+
+def etag(version: int) -> str:
+    return f'W/"{version}"'
+
+
+def versiones(header: str) -> list[int] | None:
+    """
+    Versiones de un If-None-Match / If-Match. None -> "*" (cualquiera).
+    Las etiquetas que no son nuestras se ignoran (nunca coinciden).
+    """
+    encontradas = []
+    for valor in header.split(","):
+        valor = valor.strip()
+        if valor == "*":
+            return None
+        valor = valor.removeprefix("W/").strip('"')
+        if valor.isdigit():
+            encontradas.append(int(valor))
+    return encontradas
+
+
+def coincide(header: str, version: int) -> bool:
+    pedidas = versiones(header)
+    return pedidas is None or version in pedidas
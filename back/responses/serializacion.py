@@ -0,0 +1,96 @@
+# Respuestas que se serializan una sola vez
+"""
+Si un endpoint devuelve un modelo y declara response_model, FastAPI lo
+vuelve a validar contra response_model, lo pasa a dicts de Python y
+recien despues la clase de respuesta lo codifica a JSON.
+Nuestros modelos ya salen validos de Database, asi que aqui se pasan
+directo al serializer compilado de pydantic-core (dump_json, en Rust) y
+se devuelve la Response armada: FastAPI no toca el contenido.
+
+Los TypeAdapter se construyen una vez por tipo (lru_cache), armar uno
+por request costaria mas que serializar.
+
+respuesta() ademas negocia el formato: con "Accept: application/msgpack"
+(y msgpack instalado) responde MessagePack, si no JSON. Se respetan los
+q del Accept: "application/msgpack;q=0" es JSON.
+"""
+from functools import lru_cache
+from typing import Any
+
+from fastapi import Request
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+
+try:
+    # opcional: MessagePack para los servicios internos
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MEDIA_TYPE_JSON = "application/json"
+MEDIA_TYPE_MSGPACK = "application/msgpack"
+MEDIA_TYPES_MSGPACK = (MEDIA_TYPE_MSGPACK, "application/x-msgpack")
+
+
+@lru_cache(maxsize=None)
+def adaptador(tipo: Any) -> TypeAdapter:
+    return TypeAdapter(tipo)
+
+
+def respuesta_json(datos: Any, tipo: Any = None, status_code: int = 200,
+                   headers: dict[str, str] | None = None, exclude_unset: bool = False) -> Response:
+    """
+    pre:
+        datos: instancia (o lista) de modelos ya validados
+        tipo: el tipo a serializar, por ejemplo list[UpsertUser]; por
+              defecto type(datos), que alcanza para un modelo suelto
+        exclude_unset: solo los campos asignados (?fields=, ver Database._fila_publica)
+    """
+    cuerpo = adaptador(tipo or type(datos)).dump_json(datos, exclude_unset=exclude_unset)
+    return Response(content=cuerpo, status_code=status_code, headers=headers, media_type=MEDIA_TYPE_JSON)
+
+
+def acepta_msgpack(request: Request) -> bool:
+    if msgpack is None:
+        return False
+    return prefiere_msgpack(request.headers.get("accept", ""))
+
+
+@lru_cache(maxsize=256)
+def prefiere_msgpack(accept: str) -> bool:
+    """
+    MessagePack solo si el Accept lo nombra con q > 0 y con mas q que
+    JSON (JSON por su nombre o, si no esta, application/* o */*).
+    Empate con application/json explicito: JSON, es el formato por defecto.
+    """
+    calidades: dict[str, float] = {}
+    for parte in accept.lower().split(","):
+        media_type, *parametros = (campo.strip() for campo in parte.split(";"))
+        q = 1.0
+        for parametro in parametros:
+            nombre, _, valor = parametro.partition("=")
+            if nombre.strip() == "q":
+                try:
+                    q = float(valor)
+                except ValueError:
+                    q = 0.0
+        if media_type:
+            calidades[media_type] = max(q, calidades.get(media_type, 0.0))
+
+    q_msgpack = max((calidades.get(media_type, 0.0) for media_type in MEDIA_TYPES_MSGPACK), default=0.0)
+    if q_msgpack <= 0:
+        return False
+    if MEDIA_TYPE_JSON in calidades:
+        return q_msgpack > calidades[MEDIA_TYPE_JSON]
+    return q_msgpack >= max(calidades.get("application/*", 0.0), calidades.get("*/*", 0.0))
+
+
+def respuesta(request: Request, datos: Any, tipo: Any = None, status_code: int = 200,
+              headers: dict[str, str] | None = None, exclude_unset: bool = False) -> Response:
+    """Como respuesta_json, pero en MessagePack si el cliente lo pide en Accept."""
+    headers = {**(headers or {}), "Vary": "Accept"}
+    if not acepta_msgpack(request):
+        return respuesta_json(datos, tipo, status_code=status_code, headers=headers, exclude_unset=exclude_unset)
+    # mode="json": fechas, etc. quedan como en la version JSON
+    cuerpo = msgpack.packb(adaptador(tipo or type(datos)).dump_python(datos, mode="json", exclude_unset=exclude_unset))
+    return Response(content=cuerpo, status_code=status_code, headers=headers, media_type=MEDIA_TYPE_MSGPACK)
@@ -0,0 +1,60 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+# Escritor unico de la base de datos
+from database.writer import writer
+from database.cache import user_cache
+from security.hashing import hashing_pool
+from middleware.rate_limit import rate_limit_buckets
+from database.dbase import Database
+# Dependecias
+from dependencies.dependencie import AsyncSessionDep
+from dependencies.auth import usuario_admin
+# Modelos Publicos
+from schema.user import EstadisticasUsuarios
+# Base de Datos
+database_instance = Database()
+
+MEDIA_TYPES_EXPORT = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(usuario_admin)])
+"""
+Endpoints de administracion y metricas internas (token de un usuario en ADMIN_USER_IDS)
+"""
+@router.get(path="/metrics/writer", status_code=200)
+def writer_metrics() -> dict[str, float | int]:
+    # profundidad de la cola y tiempo de espera de las escrituras
+    return writer.stats()
+
+@router.get(path="/metrics/hashing", status_code=200)
+def hashing_metrics() -> dict[str, float | int]:
+    # tareas de Argon2 pendientes, rechazadas (429) y su duracion
+    return hashing_pool.stats()
+
+@router.get(path="/metrics/rate-limit", status_code=200)
+def rate_limit_metrics() -> dict[str, float | int]:
+    # requests permitidas y rechazadas (429), clientes en la tabla
+    return rate_limit_buckets.stats()
+
+@router.get(path="/metrics/cache", status_code=200)
+def cache_metrics() -> dict[str, float | int | bool]:
+    # hits, misses y evictions del cache de GET /users/{id}
+    return user_cache.stats()
+
+@router.get(path="/users/export")
+def export_users(formato: Literal["ndjson", "csv"] = Query(default="ndjson", alias="format")):
+    # el generador es sincrono: Starlette lo recorre en el threadpool
+    return StreamingResponse(
+        database_instance.exportar_usuarios(formato),
+        media_type=MEDIA_TYPES_EXPORT[formato],
+        headers={"Content-Disposition": f'attachment; filename="users.{formato}"'},
+    )
+
+@router.get(path="/users/stats", response_model=EstadisticasUsuarios)
+async def users_stats(session: AsyncSessionDep) -> EstadisticasUsuarios:
+    # O(1): contadores mantenidos por triggers, no un SELECT sobre user
+    return await database_instance.estadisticas_async(session)
@@ -0,0 +1,33 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+from fastapi.security import OAuth2PasswordRequestForm
+from database.dbase import Database
+# Dependecias
+from dependencies.dependencie import AsyncSessionDep
+from dependencies.auth import crear_token, credenciales_invalidas
+# Modelos Publicos
+from schema.user import Token
+# Argon2 en el pool de procesos
+from security.hashing import hashing_pool
+# Base de Datos
+database_instance = Database()
+
+router = APIRouter()
+"""
+Login: el username del formulario OAuth2 es el email del usuario.
+El token se manda despues en "Authorization: Bearer <token>".
+"""
+@router.post(path="/token", response_model=Token)
+async def login(session: AsyncSessionDep, form_data: Annotated[OAuth2PasswordRequestForm, Depends()]) -> Token:
+    credenciales = await database_instance.credenciales_async(session, form_data.username)
+    # si el email no existe se verifica igual contra un hash falso: la
+    # respuesta tarda lo mismo y no delata que emails estan registrados
+    guardado = credenciales.password if credenciales is not None else await hashing_pool.hash_falso()
+    valida, nuevo_hash = await hashing_pool.verificar_y_actualizar(form_data.password, guardado)
+    if not valida or credenciales is None:
+        raise credenciales_invalidas()
+    if nuevo_hash is not None:
+        # parametros de Argon2 viejos (o texto plano): se guarda el hash nuevo
+        await database_instance.reemplazar_hash_async(credenciales.user_id, guardado, nuevo_hash)
+    return crear_token(credenciales.user_id)
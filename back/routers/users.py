@@ -1,9 +1,28 @@
-from fastapi import APIRouter, Path, Query, Body
+from typing import Any
+
+from fastapi import APIRouter, Path, Query, Body, Depends, Header, HTTPException, Request
+from fastapi.responses import Response
+from pydantic import ValidationError
 from database.dbase import Database
+# Respuestas serializadas una sola vez, en JSON o MessagePack segun Accept
+from responses.serializacion import respuesta
+# ETag = version del usuario (GET condicional e If-Match)
+from responses.etag import etag, coincide, versiones
+# CVs por contenido, leidos del body en streaming
+from storage.cv import guardar_cv
 # Dependecias
-from dependencies.dependencie import SessionDep
+from dependencies.dependencie import AsyncSessionDep
+from dependencies.contenido import cuerpo, esquema_cuerpo, leer_cuerpo
+from dependencies.auth import UsuarioActual, exigir_propietario
 # Modelos Publicos
-from schema.user import UpsertUser, UpdateUser, CreateUser 
+from schema.user import (
+    UpsertUser, UpdateUser, CreateUser,
+    PaginaUsuarios, UsuariosPorId, ResultadoLote, ArchivoCV
+)
+from config.settings import (
+    USERS_PAGE_DEFAULT, USERS_PAGE_MAX, USERS_BATCH_MAX,
+    USERS_IDS_MAX, USERS_SEARCH_MAX
+)
 # Base de Datos
 database_instance = Database()
 
@@ -11,13 +30,170 @@ router = APIRouter(prefix="/users")
 """
 GET y DELETE NOT BODY
 
+Los endpoints son async def y usan AsyncSessionDep (aiosqlite),
+asi no ocupan un hilo del threadpool mientras esperan a la base de datos.
+Devuelven respuesta(...): response_model queda solo para la documentacion.
+Con "Accept: application/msgpack" responden MessagePack, y los POST
+aceptan el body en MessagePack con "Content-Type: application/msgpack".
+Los GET aceptan ?fields=name,email: se leen y se devuelven solo esos campos.
 """
+CAMPOS = Query(default=None, description="campos de UpsertUser separados por coma: name,email")
+
+@router.get(path="/", response_model=PaginaUsuarios | UsuariosPorId)
+async def list_users(
+    request: Request,
+    session: AsyncSessionDep,
+    cursor: str | None = Query(default=None, description="next_cursor de la pagina anterior"),
+    limit: int = Query(default=USERS_PAGE_DEFAULT, ge=1, le=USERS_PAGE_MAX),
+    ids: str | None = Query(default=None, description="ids separados por coma: 1,2,3"),
+    fields: str | None = CAMPOS,
+) -> Response:
+    campos = parsear_campos(fields)
+    # con ?ids= se buscan esos usuarios en una sola query, sin paginar
+    if ids is not None:
+        usuarios = await database_instance.obtener_usuarios_async(session, parsear_ids(ids), campos)
+        return respuesta(request, usuarios, exclude_unset=campos is not None)
+    pagina = await database_instance.listar_usuarios_async(session, cursor=cursor, limit=limit, campos=campos)
+    return respuesta(request, pagina, exclude_unset=campos is not None)
+
+# antes de /{id}, si no "me" y "search" se tomarian como un id
+@router.get(path="/me", response_model=UpsertUser)
+async def read_user_me(request: Request, usuario: UsuarioActual) -> Response:
+    return respuesta(request, usuario)
+
+@router.get(path="/search", response_model=list[UpsertUser])
+async def search_users(
+    request: Request,
+    session: AsyncSessionDep,
+    q: str = Query(min_length=1, max_length=100, description="nombre, apellido o email (o su comienzo)"),
+    limit: int = Query(default=20, ge=1, le=USERS_SEARCH_MAX),
+    fields: str | None = CAMPOS,
+) -> Response:
+    campos = parsear_campos(fields)
+    usuarios = await database_instance.buscar_usuarios_async(session, q=q, limit=limit, campos=campos)
+    return respuesta(request, usuarios, list[UpsertUser], exclude_unset=campos is not None)
+
 @router.get(path="/{id}", response_model=UpsertUser)
-def get_user(id: int = Path()) -> UpsertUser:
-    return database_instance.obtener_usuario(user_id=id)
-
-@router.post(path="/", response_model=UpsertUser)
-def create_user(new_user: CreateUser = Body()):
-    print(new_user.model_dump())
-    return database_instance.crear_usuario(new_user)
-    
\ No newline at end of file
+async def get_user(
+    request: Request,
+    session: AsyncSessionDep,
+    id: int = Path(),
+    if_none_match: str | None = Header(default=None),
+    fields: str | None = CAMPOS,
+) -> Response:
+    campos = parsear_campos(fields)
+    if if_none_match is not None:
+        # 304 solo con la version: no se arma ni serializa el usuario
+        version = await database_instance.version_usuario_async(session, user_id=id)
+        if coincide(if_none_match, version):
+            return Response(status_code=304, headers={"ETag": etag(version), "Vary": "Accept"})
+    usuario, version = await database_instance.obtener_usuario_versionado_async(session, user_id=id, campos=campos)
+    return respuesta(request, usuario, headers={"ETag": etag(version)}, exclude_unset=campos is not None)
+
+@router.patch(path="/{id}", response_model=UpsertUser)
+async def update_user(
+    request: Request,
+    usuario: UsuarioActual,
+    id: int = Path(),
+    cambios: UpdateUser = Body(),
+    if_match: str | None = Header(default=None, description="ETag de la ultima lectura, si cambio -> 412"),
+) -> Response:
+    exigir_propietario(usuario, id)
+    esperadas = versiones(if_match) if if_match is not None else None
+    usuario, version = await database_instance.actualizar_usuario_async(id, cambios, esperadas)
+    return respuesta(request, usuario, headers={"ETag": etag(version)})
+
+@router.post(
+    path="/{id}/cv", response_model=ArchivoCV,
+    openapi_extra={"requestBody": {"content": {"application/pdf": {"schema": {"type": "string", "format": "binary"}}}}},
+)
+async def upload_cv(request: Request, session: AsyncSessionDep, usuario: UsuarioActual, id: int = Path()) -> Response:
+    """
+    El body es el archivo tal cual (no multipart): se escribe a disco a
+    medida que llega, nunca esta entero en memoria.
+    """
+    exigir_propietario(usuario, id)
+    # 404 antes de leer el archivo
+    await database_instance.version_usuario_async(session, user_id=id)
+    content_length = request.headers.get("content-length")
+    sha256, tamano, repetido = await guardar_cv(
+        request.stream(), int(content_length) if content_length and content_length.isdigit() else None
+    )
+    _, version = await database_instance.actualizar_usuario_async(id, UpdateUser(cv=sha256))
+    archivo = ArchivoCV(user_id=id, cv=sha256, size=tamano, deduplicated=repetido)
+    return respuesta(request, archivo, headers={"ETag": etag(version)})
+
+@router.post(path="/", response_model=UpsertUser, openapi_extra=esquema_cuerpo(CreateUser))
+async def create_user(request: Request, new_user: CreateUser = Depends(cuerpo(CreateUser))) -> Response:
+    return respuesta(request, await database_instance.crear_usuario_async(new_user))
+
+
+@router.post(path="/batch", response_model=list[ResultadoLote], openapi_extra=esquema_cuerpo(list[CreateUser]))
+async def create_users_batch(request: Request, session: AsyncSessionDep, new_users: Any = Depends(leer_cuerpo)) -> Response:
+    """
+    Crea varios usuarios en una sola transaccion. Un item invalido no
+    rechaza el lote: se devuelve su error y los demas se insertan.
+    Lo mismo con un email repetido dentro del lote o que ya existe.
+    """
+    if not isinstance(new_users, list):
+        raise HTTPException(detail="El body tiene que ser una lista de usuarios", status_code=422)
+    if len(new_users) > USERS_BATCH_MAX:
+        raise HTTPException(detail=f"Maximo {USERS_BATCH_MAX} usuarios por lote", status_code=413)
+
+    errores: dict[int, list[dict]] = {}
+    validos: list[tuple[int, CreateUser]] = []
+    emails: set[str] = set()
+    for index, item in enumerate(new_users):
+        try:
+            user = CreateUser.model_validate(item)
+        except ValidationError as error:
+            errores[index] = error.errors(include_url=False, include_context=False, include_input=False)
+            continue
+        if user.email in emails:
+            errores[index] = [error_email("Email repetido dentro del lote")]
+            continue
+        emails.add(user.email)
+        validos.append((index, user))
+
+    # los que ya existen, en una sola query en vez de esperar el 409 del INSERT
+    existentes = await database_instance.emails_existentes_async(session, [user.email for _, user in validos])
+    for index, user in validos:
+        if user.email in existentes:
+            errores[index] = [error_email("Ya existe un usuario con ese email")]
+    validos = [(index, user) for index, user in validos if user.email not in existentes]
+
+    creados = await database_instance.crear_usuarios_async([user for _, user in validos])
+    por_indice = {index: user for (index, _), user in zip(validos, creados)}
+    resultados = [
+        ResultadoLote.model_construct(index=index, user=por_indice.get(index), error=errores.get(index))
+        for index in range(len(new_users))
+    ]
+    return respuesta(request, resultados, list[ResultadoLote])
+
+
+def error_email(mensaje: str) -> dict:
+    # mismo formato que los errores de validacion de pydantic
+    return {"type": "email_repetido", "loc": ["email"], "msg": mensaje}
+
+
+def parsear_ids(ids: str) -> list[int]:
+    try:
+        lista = [int(user_id) for user_id in ids.split(",") if user_id.strip()]
+    except ValueError:
+        raise HTTPException(detail="ids debe ser una lista de enteros separados por coma", status_code=422)
+    if len(lista) > USERS_IDS_MAX:
+        raise HTTPException(detail=f"Maximo {USERS_IDS_MAX} ids por request", status_code=422)
+    return lista
+
+
+def parsear_campos(fields: str | None) -> frozenset[str] | None:
+    """?fields=name,email -> frozenset (la clave de la proyeccion cacheada)."""
+    if fields is None:
+        return None
+    campos = frozenset(campo.strip() for campo in fields.split(",") if campo.strip())
+    desconocidos = campos - UpsertUser.model_fields.keys()
+    if not campos or desconocidos:
+        raise HTTPException(
+            detail=f"fields acepta: {', '.join(UpsertUser.model_fields)}", status_code=422
+        )
+    return campos
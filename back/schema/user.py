@@ -1,35 +1,75 @@
+from sqlalchemy import text
 from sqlmodel import SQLModel, Field
 
 class BaseUser(SQLModel):
-    name: str = Field(index=True)
-    lastname: str = Field(index=True) # apellido
-    age: int | None = Field(default=None, index=True) # edad 
+    # Indices solo donde hay una query que los usa (cada indice extra
+    # se actualiza en cada INSERT): email (login, unico). La busqueda por
+    # nombre usa user_fts (migracion v3), no un indice sobre name
+    name: str = Field()
+    lastname: str = Field() # apellido
+    age: int | None = Field(default=None) # edad 
 
 class User(BaseUser, table=True):
     # cuando se cree va ha ser user_id
     id: int | None = Field(default=None, primary_key=True)
-    email: str = Field(index=True)
-    password: str = Field(index=True)
-    cv: str = Field(index=True)
+    email: str = Field(index=True, unique=True)
+    password: str = Field()
+    cv: str = Field()
+    # sube en cada escritura: ETag de GET /users/{id} e If-Match de PATCH
+    version: int = Field(default=1, sa_column_kwargs={"server_default": text("1")})
 
 class UpsertUser(BaseUser):
     user_id: int = Field(default=None) 
     email: str = Field(default=None)
 
+# GET /users/ (paginado por cursor)
+class PaginaUsuarios(SQLModel):
+    items: list[UpsertUser]
+    next_cursor: str | None = None # None -> no hay mas paginas
+
+# GET /users/?ids=1,2,3 (mismo orden que los ids pedidos)
+class UsuariosPorId(SQLModel):
+    items: list[UpsertUser | None] # None -> ese id no existe
+    not_found: list[int]
+
 # POST 
 class CreateUser(BaseUser):
     email: str = Field()
     password: str = Field()
     cv: str = Field()
 
-# PUT -> PATCH
+# POST /users/batch: un resultado por item, en el mismo orden
+class ResultadoLote(SQLModel):
+    index: int
+    user: UpsertUser | None = None
+    error: list[dict] | None = None # errores de validacion de ese item
+
+# PUT -> PATCH (solo se actualizan los campos enviados)
 class UpdateUser(BaseUser): # Actualizar
     name: str = Field(default=None)
+    lastname: str = Field(default=None)
     age: int = Field(default=None)
+    email: str = Field(default=None)
     password: str = Field(default= None)
     cv: str = Field(default=None)
 
+# POST /users/{id}/cv
+class ArchivoCV(SQLModel):
+    user_id: int
+    cv: str # sha256 del contenido, tambien queda en User.cv
+    size: int
+    deduplicated: bool # ya habia un CV identico guardado
+
 # DELETE
 class DeleteUser(BaseUser):
     password: str = Field(max_length=20, min_length=1)
-    
\ No newline at end of file
+    
+# GET /admin/users/stats
+class EstadisticasUsuarios(SQLModel):
+    total: int
+    by_age: dict[str, int] # bucket de edad -> cantidad
+
+# POST /token
+class Token(SQLModel):
+    access_token: str
+    token_type: str
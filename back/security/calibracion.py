@@ -0,0 +1,97 @@
+# Calibracion de los parametros de Argon2
+"""
+Mide la verificacion con distintas combinaciones de time_cost y
+memory_cost en esta maquina y recomienda la mas cara (primero memoria,
+despues iteraciones) cuya mediana entra en la latencia objetivo.
+Cada combinacion corre en un proceso nuevo, asi el pico de memoria
+(ru_maxrss) que se reporta es solo de esa combinacion.
+
+Uso (desde back/):
+    python -m security.calibracion --target-ms 100
+    python -m security.calibracion --target-ms 250 --memory 19456 65536 131072 --time 1 2 3 4
+
+La recomendacion se aplica con ARGON2_TIME_COST y ARGON2_MEMORY_COST en
+.env; los hashes existentes se rehacen en el siguiente login de cada
+usuario (hashing_pool.verificar_y_actualizar).
+"""
+import argparse
+import multiprocessing
+import resource
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
+
+from config.settings import HASH_WORKERS, ARGON2_TIME_COST, ARGON2_MEMORY_COST, ARGON2_PARALLELISM
+
+# KiB; 19 MiB es el minimo que recomienda OWASP para argon2id
+MEMORIAS = (19456, 32768, 65536, 131072)
+ITERACIONES = (1, 2, 3, 4)
+
+
+def medir(time_cost: int, memory_cost: int, parallelism: int, repeticiones: int) -> dict:
+    """Corre en un proceso aparte (uno por combinacion)."""
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    password_hash = PasswordHash((
+        Argon2Hasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism),
+    ))
+    guardado = password_hash.hash("calibracion")
+    latencias = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        password_hash.verify("calibracion", guardado)
+        latencias.append(time.perf_counter() - inicio)
+    return {
+        "time_cost": time_cost,
+        "memory_cost": memory_cost,
+        "p50_ms": statistics.median(latencias) * 1000,
+        "max_ms": max(latencias) * 1000,
+        # ru_maxrss esta en KiB en Linux
+        "rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base,
+    }
+
+
+def recomendar(resultados: list[dict], objetivo_ms: float) -> dict | None:
+    entran = [r for r in resultados if r["p50_ms"] <= objetivo_ms]
+    if not entran:
+        return None
+    return max(entran, key=lambda r: (r["memory_cost"], r["time_cost"]))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Recomienda parametros de Argon2 para una latencia objetivo")
+    parser.add_argument("--target-ms", type=float, default=100, help="latencia de verificacion buscada (mediana)")
+    parser.add_argument("--time", type=int, nargs="+", default=ITERACIONES)
+    parser.add_argument("--memory", type=int, nargs="+", default=MEMORIAS, help="KiB")
+    parser.add_argument("--parallelism", type=int, default=ARGON2_PARALLELISM)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    resultados = []
+    contexto = multiprocessing.get_context("spawn")
+    for memory_cost in args.memory:
+        for time_cost in args.time:
+            with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as proceso:
+                resultado = proceso.submit(medir, time_cost, memory_cost, args.parallelism, args.repeat).result()
+            resultados.append(resultado)
+            actual = " (actual)" if (time_cost, memory_cost) == (ARGON2_TIME_COST, ARGON2_MEMORY_COST) else ""
+            print(
+                f"t={time_cost} m={memory_cost:>6} KiB: verify p50 {resultado['p50_ms']:7.1f} ms"
+                f"   max {resultado['max_ms']:7.1f} ms   memoria {resultado['rss_kib'] / 1024:6.1f} MiB{actual}"
+            )
+
+    elegido = recomendar(resultados, args.target_ms)
+    if elegido is None:
+        print(f"ninguna combinacion verifica en {args.target_ms} ms; la mas rapida:")
+        elegido = min(resultados, key=lambda r: r["p50_ms"])
+    print(f"\nrecomendado para {args.target_ms} ms (p={args.parallelism}):")
+    print(f"ARGON2_TIME_COST={elegido['time_cost']}")
+    print(f"ARGON2_MEMORY_COST={elegido['memory_cost']}")
+    # cada proceso del pool reserva su propia memoria
+    print(f"pico con {HASH_WORKERS} workers: ~{HASH_WORKERS * elegido['memory_cost'] / 1024:.0f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+# Hashing de contrasenas en un pool de procesos
+"""
+Argon2 (PasswordHash.recommended() de pwdlib, como en
+guia_basica_usuario/seguridad_9/4_auth.py) esta hecho para ser caro:
+decenas de milisegundos de CPU y 64 MiB de memoria por hash. Hecho en el
+event loop bloquea a todos los endpoints; en el threadpool ocupa los
+hilos que usan los endpoints sync.
+
+Aqui corre en un ProcessPoolExecutor con un proceso por core, y los
+endpoints async solo esperan el resultado. La cantidad de tareas
+pendientes esta acotada (HASH_QUEUE_SIZE): si se llena se responde 429,
+asi una avalancha de logins no deja sin CPU al resto de la API. Cada
+pendiente es un hash: un lote de POST /users/batch reserva uno por
+contrasena y nunca mas de la mitad de la cola.
+
+Si un proceso del pool muere (Argon2 usa 64 MiB por hash, el OOM killer
+es posible) el ProcessPoolExecutor queda roto: las tareas que estaban en
+curso responden 503 y el siguiente envio rehace el pool.
+
+Las contrasenas guardadas antes de que existiera el hashing estan en
+texto plano: verificar() las compara con compare_digest.
+
+verificar_y_actualizar() ademas devuelve un hash nuevo cuando el guardado
+usa otros parametros de Argon2 (o es texto plano), para rehacerlo en el
+login sin pedirle nada al usuario.
+"""
+import asyncio
+import multiprocessing
+import secrets
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable
+
+from fastapi import HTTPException
+from pwdlib import PasswordHash
+from pwdlib.exceptions import UnknownHashError
+from pwdlib.hashers.argon2 import Argon2Hasher
+
+from config.settings import (
+    HASH_WORKERS, HASH_QUEUE_SIZE,
+    ARGON2_TIME_COST, ARGON2_MEMORY_COST, ARGON2_PARALLELISM,
+)
+
+# uno por proceso del pool (se crea al importar el modulo en el worker)
+password_hash = PasswordHash((
+    Argon2Hasher(time_cost=ARGON2_TIME_COST, memory_cost=ARGON2_MEMORY_COST, parallelism=ARGON2_PARALLELISM),
+))
+# cada cuanto reintenta una ronda de un lote que no entra
+ESPERA_LOTE = 0.01
+
+
+# Lo que corre dentro de los procesos del pool: funciones de modulo (picklables)
+def _hashear(passwords: list[str]) -> list[str]:
+    return [password_hash.hash(password) for password in passwords]
+
+
+def _verificar(password: str, guardado: str) -> tuple[bool, str | None]:
+    """(es correcta, hash nuevo si hay que reemplazar el guardado)."""
+    try:
+        return password_hash.verify_and_update(password, guardado)
+    except UnknownHashError:
+        # contrasena de antes del hashing, en texto plano
+        if secrets.compare_digest(password.encode(), guardado.encode()):
+            return True, password_hash.hash(password)
+        return False, None
+
+
+class HashingMetrics():
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.completadas = 0
+        self.rechazadas = 0
+        self.duracion_total = 0.0
+        self.duracion_maxima = 0.0
+
+    def registrar(self, duracion: float) -> None:
+        with self._lock:
+            self.completadas += 1
+            self.duracion_total += duracion
+            self.duracion_maxima = max(self.duracion_maxima, duracion)
+
+    def rechazar(self) -> None:
+        with self._lock:
+            self.rechazadas += 1
+
+    def snapshot(self, pendientes: int, workers: int) -> dict[str, float | int]:
+        with self._lock:
+            return {
+                "workers": workers,
+                "pending": pendientes,
+                # las que esperan un proceso libre
+                "queue_depth": max(pendientes - workers, 0),
+                "max_pending": HASH_QUEUE_SIZE,
+                "completed": self.completadas,
+                "rejected": self.rechazadas,
+                "avg_ms": self.duracion_total / (self.completadas or 1) * 1000,
+                "max_ms": self.duracion_maxima * 1000,
+            }
+
+
+class HashingPool():
+    def __init__(self, workers: int, max_pendientes: int) -> None:
+        self.workers = workers
+        self.max_pendientes = max_pendientes
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._pendientes = 0
+        self._hash_falso: str | None = None
+        self.metricas = HashingMetrics()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._crear_executor()
+
+    def _crear_executor(self) -> ProcessPoolExecutor:
+        # spawn: hacer fork de un proceso con hilos (escritor, aiosqlite) no es seguro
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def _reconstruir(self, roto: ProcessPoolExecutor) -> None:
+        with self._lock:
+            # otra request ya lo rehizo (o se llamo a stop)
+            if self._executor is not roto:
+                return
+            roto.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._crear_executor()
+
+    def stop(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+    def submit(self, funcion: Callable, *args) -> Future:
+        """Encola sin bloquear; 429 si ya hay max_pendientes tareas."""
+        self._reservar(1)
+        return self._enviar(funcion, *args)
+
+    def _reservar(self, cantidad: int) -> None:
+        if not self._intentar_reservar(cantidad, self.max_pendientes):
+            raise self._rechazar()
+
+    def _rechazar(self) -> HTTPException:
+        self.metricas.rechazar()
+        return HTTPException(status_code=429, detail="Demasiadas operaciones de contrasena pendientes",
+                             headers={"Retry-After": "1"})
+
+    def _intentar_reservar(self, cantidad: int, limite: int) -> bool:
+        # todo o nada: una ronda no queda a medias si no entra
+        self.start()
+        with self._lock:
+            if self._pendientes + cantidad > limite:
+                return False
+            self._pendientes += cantidad
+            return True
+
+    def _enviar(self, funcion: Callable, *args) -> Future:
+        inicio = time.perf_counter()
+        executor = self._executor
+        try:
+            try:
+                future = executor.submit(funcion, *args)
+            except BrokenProcessPool:
+                # murio un proceso: pool nuevo y un solo reintento
+                self._reconstruir(executor)
+                future = self._executor.submit(funcion, *args)
+        except Exception:
+            self._terminar(inicio)
+            raise
+        future.add_done_callback(lambda _: self._terminar(inicio))
+        return future
+
+    def _terminar(self, inicio: float) -> None:
+        with self._lock:
+            self._pendientes -= 1
+        self.metricas.registrar(time.perf_counter() - inicio)
+
+    async def _resultado(self, future: Future):
+        try:
+            return await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            raise pool_roto()
+
+    async def hashear(self, password: str) -> str:
+        return (await self._resultado(self.submit(_hashear, [password])))[0]
+
+    async def hashear_lote(self, passwords: list[str]) -> list[str]:
+        """
+        Por rondas de un hash por proceso, reservando cada contrasena: entre
+        ronda y ronda entran los logins, que esperan como mucho un hash y no
+        el lote entero. Los lotes solo usan la mitad de la cola (el resto
+        queda para los logins): si no hay lugar para la primera ronda, 429;
+        las siguientes esperan a que los logins terminen.
+        """
+        limite = max(self.max_pendientes // 2, 1)
+        ronda = min(self.workers, limite)
+        hashes: list[str] = []
+        for inicio in range(0, len(passwords), ronda):
+            parte = passwords[inicio:inicio + ronda]
+            while not self._intentar_reservar(len(parte), limite):
+                if inicio == 0:
+                    raise self._rechazar()
+                await asyncio.sleep(ESPERA_LOTE)
+            futures = [self._resultado(self._enviar(_hashear, [password])) for password in parte]
+            hashes.extend(hashed for [hashed] in await asyncio.gather(*futures))
+        return hashes
+
+    async def hash_falso(self) -> str:
+        """
+        Para el login con un email que no existe (ver routers/auth.py). Se
+        arma con los ARGON2_* actuales: con parametros viejos verificarlo
+        costaria distinto que a un usuario real y delataria el email.
+        """
+        if self._hash_falso is None:
+            self._hash_falso = await self.hashear(secrets.token_hex(16))
+        return self._hash_falso
+
+    async def verificar(self, password: str, guardado: str) -> bool:
+        valida, _ = await self.verificar_y_actualizar(password, guardado)
+        return valida
+
+    async def verificar_y_actualizar(self, password: str, guardado: str) -> tuple[bool, str | None]:
+        return await self._resultado(self.submit(_verificar, password, guardado))
+
+    def hashear_sync(self, password: str) -> str:
+        """Para codigo sincrono: espera en el hilo actual."""
+        try:
+            return self.submit(_hashear, [password]).result()[0]
+        except BrokenProcessPool:
+            raise pool_roto()
+
+    def pendientes(self) -> int:
+        return self._pendientes
+
+    def stats(self) -> dict[str, float | int]:
+        return self.metricas.snapshot(self._pendientes, self.workers)
+
+
+def pool_roto() -> HTTPException:
+    # la tarea estaba en un proceso que murio; el pool ya se rehace solo
+    return HTTPException(status_code=503, detail="Error temporal al procesar la contrasena",
+                         headers={"Retry-After": "1"})
+
+
+hashing_pool = HashingPool(HASH_WORKERS, HASH_QUEUE_SIZE)
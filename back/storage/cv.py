@@ -0,0 +1,84 @@
+# Almacenamiento de CVs por contenido (SHA-256)
+"""
+bytes o UploadFile (guia_basica_usuario/4_archivos.py) leen el archivo
+entero o lo pasan por un SpooledTemporaryFile antes de que el endpoint
+pueda hacer algo. Aqui el body de la request se consume a medida que
+llega: se escribe en bloques de CV_CHUNK_SIZE a un archivo temporal y
+se va calculando el SHA-256 en el mismo recorrido. La memoria usada es
+un bloque, no depende del tamano del archivo.
+
+El limite de tamano se revisa antes de leer (Content-Length) y mientras
+se lee (por si no vino o miente): se corta con 413 sin esperar al final.
+
+El archivo queda en CV_DIR/ab/abcdef... (su hash). Dos CVs iguales son
+el mismo archivo: si ya existe, el temporal se borra.
+"""
+import hashlib
+import os
+import tempfile
+from typing import AsyncIterator
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from config.settings import CV_DIR, CV_MAX_BYTES, CV_CHUNK_SIZE
+
+
+def ruta_cv(sha256: str) -> str:
+    # un nivel de subdirectorios: no miles de archivos en una sola carpeta
+    return os.path.join(CV_DIR, sha256[:2], sha256)
+
+
+def demasiado_grande() -> HTTPException:
+    return HTTPException(detail=f"El CV no puede superar {CV_MAX_BYTES} bytes", status_code=413)
+
+
+async def guardar_cv(partes: AsyncIterator[bytes], content_length: int | None = None) -> tuple[str, int, bool]:
+    """
+    pre:
+        partes: el body, por ejemplo request.stream()
+    Devuelve (sha256, tamano, ya_existia).
+    """
+    if content_length is not None and content_length > CV_MAX_BYTES:
+        raise demasiado_grande()
+
+    temporales = os.path.join(CV_DIR, "tmp")
+    os.makedirs(temporales, exist_ok=True)
+    # en CV_DIR: el os.replace final no copia entre discos
+    descriptor, temporal = tempfile.mkstemp(dir=temporales)
+    sha256 = hashlib.sha256()
+    tamano = 0
+    bloque = bytearray()
+    try:
+        with os.fdopen(descriptor, "wb") as archivo:
+            async for parte in partes:
+                tamano += len(parte)
+                if tamano > CV_MAX_BYTES:
+                    raise demasiado_grande()
+                sha256.update(parte)
+                bloque += parte
+                if len(bloque) >= CV_CHUNK_SIZE:
+                    # la escritura bloquea: en el threadpool, no en el event loop
+                    await run_in_threadpool(archivo.write, bloque)
+                    bloque = bytearray()
+            await run_in_threadpool(_terminar, archivo, bloque)
+
+        digest = sha256.hexdigest()
+        destino = ruta_cv(digest)
+        if os.path.exists(destino):
+            os.remove(temporal)
+            return digest, tamano, True
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        os.replace(temporal, destino)
+        return digest, tamano, False
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+
+
+def _terminar(archivo, bloque: bytearray) -> None:
+    archivo.write(bloque)
+    archivo.flush()
+    # que el contenido este en disco antes de que User.cv apunte a el
+    os.fsync(archivo.fileno())
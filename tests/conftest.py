@@ -0,0 +1,8 @@
+# Las pruebas que importan el codigo de back/ usan una base temporal
+import os
+import sys
+import tempfile
+
+BACK = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "back")
+sys.path.insert(0, BACK)
+os.environ.setdefault("DATABASE_FILE", os.path.join(tempfile.mkdtemp(), "test.db"))
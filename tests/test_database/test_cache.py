@@ -0,0 +1,56 @@
+import time
+
+from database.cache import LRUCache, MISS
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_size=2, ttl=60)
+    cache.set(1, "uno")
+    cache.set(2, "dos")
+    cache.get(1)
+    cache.set(3, "tres")
+    assert cache.get(2) is MISS
+    assert cache.get(1) == "uno"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_expires():
+    cache = LRUCache(max_size=10, ttl=0.01)
+    cache.set(1, "uno")
+    time.sleep(0.02)
+    assert cache.get(1) is MISS
+    assert cache.stats()["expirations"] == 1
+
+
+def test_set_after_invalidation_is_discarded():
+    # una lectura que empezo antes de la escritura no guarda el valor viejo
+    cache = LRUCache(max_size=10, ttl=60)
+    ticket = cache.ticket(1)
+    cache.invalidar(1)
+    cache.set(1, "viejo", ticket=ticket)
+    assert cache.get(1) is MISS
+
+
+def test_invalidation_only_discards_same_key():
+    # escribir otro usuario no descarta la lectura en curso de este
+    cache = LRUCache(max_size=10, ttl=60)
+    ticket = cache.ticket(1)
+    cache.invalidar(2)
+    cache.set(1, "uno", ticket=ticket)
+    assert cache.get(1) == "uno"
+
+
+def test_forgotten_generation_still_discards():
+    # con las generaciones llenas se olvida la de 1, pero su lectura vieja igual se descarta
+    cache = LRUCache(max_size=2, ttl=60)
+    ticket = cache.ticket(1)
+    for clave in (1, 2, 3):
+        cache.invalidar(clave)
+    cache.set(1, "viejo", ticket=ticket)
+    assert cache.get(1) is MISS
+
+
+def test_disabled_cache_never_hits():
+    cache = LRUCache(max_size=10, ttl=60, enabled=False)
+    cache.set(1, "uno")
+    assert cache.get(1) is MISS
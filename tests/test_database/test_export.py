@@ -0,0 +1,43 @@
+import tracemalloc
+
+from sqlalchemy import delete, insert
+
+from database.conect import write_engine
+from database.dbase import Database
+from database.migrations import asegurar_esquema
+from schema.user import User
+
+database_instance = Database()
+
+
+def poblar(cantidad: int) -> None:
+    with write_engine.begin() as conn:
+        conn.execute(delete(User))
+        conn.execute(insert(User), [
+            {"name": f"name{i}", "lastname": "Doe", "age": 30, "email": f"user{i}@correo",
+             "password": "secreto", "cv": "cv.pdf"}
+            for i in range(cantidad)
+        ])
+
+
+def pico_exportando(formato: str) -> tuple[int, int]:
+    # recorre el export completo y devuelve (bytes exportados, pico de memoria)
+    tracemalloc.start()
+    total = sum(len(chunk) for chunk in database_instance.exportar_usuarios(formato))
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return total, pico
+
+
+def test_export_memory_is_flat():
+    asegurar_esquema()
+    for formato in ("ndjson", "csv"):
+        poblar(5_000)
+        bytes_chico, pico_chico = pico_exportando(formato)
+        poblar(50_000)
+        bytes_grande, pico_grande = pico_exportando(formato)
+
+        # 10 veces mas filas, pero el pico de memoria no crece con la tabla
+        assert bytes_grande > 9 * bytes_chico
+        assert pico_grande < pico_chico * 1.5 + 256 * 1024
+        assert pico_grande < 4 * 1024 * 1024
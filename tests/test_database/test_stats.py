@@ -0,0 +1,21 @@
+from sqlalchemy import delete, insert, update
+
+from database.conect import write_engine
+from database.migrations import asegurar_esquema
+from database.stats import contar_desde_cero, drift, leer_contadores
+from schema.user import User
+
+
+def test_triggers_keep_stats_in_sync():
+    asegurar_esquema()
+    with write_engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"name": f"name{i}", "lastname": "Doe", "age": None if i % 10 == 0 else i % 80,
+             "email": f"stats{i}@correo", "password": "secreto", "cv": "cv.pdf"}
+            for i in range(500)
+        ])
+        conn.execute(update(User).where(User.id % 3 == 0).values(age=70))
+        conn.execute(delete(User).where(User.id % 7 == 0))
+
+    with write_engine.begin() as conn:
+        assert drift(leer_contadores(conn), contar_desde_cero(conn)) == {}
@@ -0,0 +1,33 @@
+import time
+
+from middleware.rate_limit import TokenBuckets
+
+
+def test_bucket_rejects_after_burst():
+    buckets = TokenBuckets(shards=4)
+    clave = ("POST", "/users/", "ip", "10.0.0.1")
+    assert all(buckets.tomar(clave, por_segundo=1, rafaga=3) == 0 for _ in range(3))
+    # sin fichas: hay que esperar ~1 segundo (una ficha por segundo)
+    espera = buckets.tomar(clave, por_segundo=1, rafaga=3)
+    assert 0.9 < espera <= 1
+    # otro cliente tiene su propio bucket
+    assert buckets.tomar(("POST", "/users/", "ip", "10.0.0.2"), por_segundo=1, rafaga=3) == 0
+    assert buckets.stats()["rejected"] == 1
+
+
+def test_bucket_refills():
+    buckets = TokenBuckets(shards=4)
+    clave = ("POST", "/token", "ip", "10.0.0.1")
+    buckets.tomar(clave, por_segundo=100, rafaga=1)
+    assert buckets.tomar(clave, por_segundo=100, rafaga=1) > 0
+    time.sleep(0.02)
+    assert buckets.tomar(clave, por_segundo=100, rafaga=1) == 0
+
+
+def test_idle_entries_are_evicted():
+    buckets = TokenBuckets(shards=1, idle_seconds=0.01)
+    buckets.tomar(("viejo",), por_segundo=1, rafaga=1)
+    time.sleep(0.02)
+    buckets.tomar(("nuevo",), por_segundo=1, rafaga=1)
+    assert len(buckets) == 1
+    assert buckets.stats()["evicted"] == 1
@@ -0,0 +1,29 @@
+import requests
+
+URL = "http://127.0.0.1:8000"
+
+def login() -> dict:
+    # usuario creado en test_users.test_create_user
+    response = requests.post(url=f"{URL}/token", data={"username": "correo", "password": "Hola Mundo"})
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+def test_login_wrong_password():
+    response = requests.post(url=f"{URL}/token", data={"username": "correo", "password": "otra"})
+    assert response.status_code == 401
+
+def test_users_me():
+    response = requests.get(url=f"{URL}/users/me", headers=login())
+    assert response.status_code == 200
+    assert response.json()["email"] == "correo"
+
+def test_admin_requires_admin():
+    # el servidor de prueba corre con ADMIN_USER_IDS=1
+    assert requests.get(url=f"{URL}/admin/metrics/cache").status_code == 401
+    assert requests.get(url=f"{URL}/admin/metrics/cache", headers=login()).status_code == 200
+    # cualquiera puede registrarse y sacar un token, pero no es admin
+    otro = {"name": "Otro", "lastname": "Doe", "age": 30, "email": "otro@admin", "password": "clave", "cv": "cv.pdf"}
+    requests.post(url=f"{URL}/users/", json=otro)
+    token = requests.post(url=f"{URL}/token", data={"username": "otro@admin", "password": "clave"}).json()["access_token"]
+    response = requests.get(url=f"{URL}/admin/metrics/cache", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 403
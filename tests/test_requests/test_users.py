@@ -1,5 +1,8 @@
+import msgpack
 import requests
 
+from test_auth import login
+
 URL = "http://127.0.0.1:8000"
 
 def test_create_user():
@@ -23,3 +26,116 @@ def test_create_user():
     assert response.status_code == 200
     assert response.json() == expected_response
 test_create_user()
+
+def test_list_users_cursor():
+    # la primera pagina trae un cursor opaco para pedir la siguiente
+    response = requests.get(url=f"{URL}/users/", params={"limit": 1})
+    assert response.status_code == 200
+    page = response.json()
+    assert len(page["items"]) <= 1
+    if page["next_cursor"] is not None:
+        next_page = requests.get(url=f"{URL}/users/", params={"limit": 1, "cursor": page["next_cursor"]}).json()
+        assert next_page["items"][0]["user_id"] > page["items"][0]["user_id"]
+
+def test_create_users_batch():
+    # el item invalido devuelve su error y los demas se crean igual
+    valid = {
+        "name": "Jhon",
+        "lastname": "Doe",
+        "age": 21,
+        "email": "correo.lote",
+        "password": "Hola Mundo",
+        "cv": "nombre_cv.pdf"
+    }
+    response = requests.post(url=f"{URL}/users/batch", json=[valid, {"name": "Jhon"}])
+    assert response.status_code == 200
+    first, second = response.json()
+    assert first["user"]["email"] == "correo.lote" and first["error"] is None
+    assert second["user"] is None and second["error"]
+
+def test_create_user_duplicate_email():
+    # el email es unico: 409 en POST /users/, error en su item en el lote
+    user = {"name": "Otro", "lastname": "Doe", "age": 30, "email": "correo", "password": "x", "cv": "cv.pdf"}
+    assert requests.post(url=f"{URL}/users/", json=user).status_code == 409
+    nuevo = {**user, "email": "nuevo.lote"}
+    response = requests.post(url=f"{URL}/users/batch", json=[nuevo, user, nuevo])
+    assert response.status_code == 200
+    creado, existente, repetido = response.json()
+    assert creado["user"]["email"] == "nuevo.lote" and creado["error"] is None
+    assert existente["user"] is None and existente["error"][0]["loc"] == ["email"]
+    assert repetido["user"] is None and repetido["error"][0]["loc"] == ["email"]
+
+def test_get_users_by_ids():
+    # mismo orden que los ids pedidos, None donde no existe
+    response = requests.get(url=f"{URL}/users", params={"ids": "1,999999999"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["items"][0]["user_id"] == 1
+    assert body["items"][1] is None
+    assert body["not_found"] == [999999999]
+
+def test_update_user_partial():
+    # PATCH solo cambia los campos enviados
+    before = requests.get(url=f"{URL}/users/1").json()
+    response = requests.patch(url=f"{URL}/users/1", json={"age": 30}, headers=login())
+    assert response.status_code == 200
+    assert response.json() == {**before, "age": 30}
+
+def test_search_users_prefix():
+    # "jho" encuentra a Jhon por prefijo
+    response = requests.get(url=f"{URL}/users/search", params={"q": "jho"})
+    assert response.status_code == 200
+    assert any(user["name"] == "Jhon" for user in response.json())
+
+def test_get_user_msgpack():
+    # con Accept: application/msgpack la respuesta viene en MessagePack
+    response = requests.get(url=f"{URL}/users/1", headers={"Accept": "application/msgpack"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/msgpack"
+    assert msgpack.unpackb(response.content)["user_id"] == 1
+
+def test_get_user_not_modified():
+    # con el ETag de la ultima lectura el servidor responde 304 sin body
+    etag = requests.get(url=f"{URL}/users/1").headers["ETag"]
+    response = requests.get(url=f"{URL}/users/1", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+def test_update_user_requires_owner():
+    # sin token 401; con el token de otro usuario 403
+    assert requests.patch(url=f"{URL}/users/1", json={"password": "otra"}).status_code == 401
+    assert requests.patch(url=f"{URL}/users/2", json={"age": 50}, headers=login()).status_code == 403
+
+def test_update_user_if_match():
+    token = login()
+    etag = requests.get(url=f"{URL}/users/1").headers["ETag"]
+    response = requests.patch(url=f"{URL}/users/1", json={"age": 40}, headers={**token, "If-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    # otro cliente con el ETag viejo: 412 en vez de pisar el cambio
+    response = requests.patch(url=f"{URL}/users/1", json={"age": 41}, headers={**token, "If-Match": etag})
+    assert response.status_code == 412
+
+def test_get_users_sparse_fields():
+    response = requests.get(url=f"{URL}/users/", params={"limit": 2, "fields": "name,email"})
+    assert response.status_code == 200
+    for item in response.json()["items"]:
+        assert set(item) == {"name", "email"}
+    # solo user_id: una sola columna en la query
+    for params in ({"limit": 2, "fields": "user_id"}, {"ids": "1", "fields": "user_id"}):
+        response = requests.get(url=f"{URL}/users/", params=params)
+        assert response.status_code == 200
+        assert response.json()["items"][0] == {"user_id": 1}
+    # solo campos de UpsertUser: password no se puede pedir
+    response = requests.get(url=f"{URL}/users/1", params={"fields": "name,password"})
+    assert response.status_code == 422
+
+def test_upload_cv_dedupe():
+    # el body es el archivo; el mismo contenido queda guardado una sola vez
+    contenido = b"%PDF-1.4 cv de prueba"
+    headers = {**login(), "Content-Type": "application/pdf"}
+    first = requests.post(url=f"{URL}/users/1/cv", data=contenido, headers=headers)
+    second = requests.post(url=f"{URL}/users/1/cv", data=contenido, headers=headers)
+    assert first.status_code == 200 and second.status_code == 200
+    assert first.json()["cv"] == second.json()["cv"]
+    assert second.json()["deduplicated"] is True
@@ -0,0 +1,20 @@
+import pytest
+
+from responses.serializacion import prefiere_msgpack
+
+
+@pytest.mark.parametrize("accept, esperado", [
+    ("application/msgpack", True),
+    ("application/x-msgpack", True),
+    ("application/msgpack, */*;q=0.5", True),
+    ("application/json;q=0.5, application/msgpack", True),
+    # q=0 es "no lo quiero"
+    ("application/msgpack;q=0", False),
+    ("application/json, application/msgpack;q=0.1", False),
+    # empate con JSON explicito: JSON
+    ("application/msgpack, application/json", False),
+    ("*/*", False),
+    ("", False),
+])
+def test_accept_negotiation(accept, esperado):
+    assert prefiere_msgpack(accept) is esperado
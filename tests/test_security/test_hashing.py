@@ -0,0 +1,94 @@
+import asyncio
+import os
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
+
+from security.hashing import HashingPool, _verificar, password_hash
+
+
+def test_pool_rejects_when_saturated():
+    # con el pool lleno responde 429 en lugar de encolar sin limite
+    pool = HashingPool(workers=1, max_pendientes=1)
+    try:
+        ocupado = pool.submit(time.sleep, 0.5)
+        with pytest.raises(HTTPException) as error:
+            pool.submit(time.sleep, 0)
+        assert error.value.status_code == 429
+        ocupado.result()
+        assert pool.stats()["rejected"] == 1
+    finally:
+        pool.stop()
+
+
+def test_batch_leaves_room_for_logins():
+    # el lote va por rondas y reserva por contrasena, nunca mas de la mitad de la cola
+    pool = HashingPool(workers=2, max_pendientes=4)
+    try:
+        async def flujo():
+            lote = asyncio.create_task(pool.hashear_lote([f"clave{i}" for i in range(6)]))
+            await asyncio.sleep(0.05)
+            # un login entra aunque el lote siga corriendo
+            guardado = await pool.hashear("secreto")
+            return await lote, guardado
+        hashes, guardado = asyncio.run(flujo())
+        assert len(hashes) == 6 and all(hashed.startswith("$argon2") for hashed in hashes)
+        assert guardado.startswith("$argon2")
+        assert pool.stats()["rejected"] == 0
+    finally:
+        pool.stop()
+
+
+def test_pool_recovers_from_dead_worker():
+    # un proceso que muere (OOM) rompe el pool: se rehace en el siguiente envio
+    pool = HashingPool(workers=1, max_pendientes=4)
+    try:
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(pool._resultado(pool.submit(os._exit, 1)))
+        assert error.value.status_code == 503
+        assert asyncio.run(pool.hashear("secreto")).startswith("$argon2")
+    finally:
+        pool.stop()
+
+
+def test_hash_and_verify():
+    pool = HashingPool(workers=1, max_pendientes=4)
+    try:
+        async def flujo():
+            guardado = await pool.hashear("secreto")
+            return guardado, await pool.verificar("secreto", guardado), await pool.verificar("otro", guardado)
+        guardado, correcta, incorrecta = asyncio.run(flujo())
+        assert guardado.startswith("$argon2")
+        assert correcta and not incorrecta
+    finally:
+        pool.stop()
+
+
+def test_dummy_hash_uses_current_params():
+    # verificar el hash falso cuesta lo mismo que el de un usuario: mismos parametros, sin rehash
+    pool = HashingPool(workers=1, max_pendientes=4)
+    try:
+        async def flujo():
+            falso = await pool.hash_falso()
+            return falso, await pool.hash_falso(), await pool.verificar_y_actualizar("otro", falso)
+        falso, otra_vez, resultado = asyncio.run(flujo())
+        assert falso == otra_vez
+        assert password_hash.current_hasher.check_needs_rehash(falso) is False
+        assert resultado == (False, None)
+    finally:
+        pool.stop()
+
+
+def test_outdated_hash_is_updated():
+    # hash con otros parametros (o texto plano de antes): se devuelve uno nuevo
+    viejo = PasswordHash((Argon2Hasher(time_cost=1, memory_cost=8192),)).hash("secreto")
+    correcta, nuevo = _verificar("secreto", viejo)
+    assert correcta and nuevo is not None and nuevo != viejo
+    assert _verificar("secreto", nuevo) == (True, None)
+    correcta, nuevo = _verificar("secreto", "secreto")
+    assert correcta and nuevo.startswith("$argon2")
+    assert _verificar("otro", "secreto") == (False, None)
@@ -0,0 +1,55 @@
+import asyncio
+import hashlib
+import os
+import tracemalloc
+
+import pytest
+from fastapi import HTTPException
+
+from storage import cv
+
+BLOQUE = b"x" * 65536
+
+
+async def partes(cantidad: int):
+    for _ in range(cantidad):
+        yield BLOQUE
+
+
+def pico_guardando(cantidad: int) -> tuple[str, int]:
+    tracemalloc.start()
+    sha256, _, _ = asyncio.run(cv.guardar_cv(partes(cantidad)))
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return sha256, pico
+
+
+def test_upload_memory_is_flat(tmp_path, monkeypatch):
+    monkeypatch.setattr(cv, "CV_DIR", str(tmp_path))
+    monkeypatch.setattr(cv, "CV_MAX_BYTES", 64 * 1024 * 1024)
+    _, pico_chico = pico_guardando(16)  # 1 MiB
+    sha256, pico_grande = pico_guardando(512)  # 32 MiB
+
+    assert sha256 == hashlib.sha256(BLOQUE * 512).hexdigest()
+    assert os.path.getsize(cv.ruta_cv(sha256)) == 32 * 1024 * 1024
+    # 32 veces mas grande, pero el pico de memoria es el mismo
+    assert pico_grande < pico_chico * 1.5 + 256 * 1024
+
+
+def test_identical_uploads_are_stored_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(cv, "CV_DIR", str(tmp_path))
+    primero = asyncio.run(cv.guardar_cv(partes(2)))
+    segundo = asyncio.run(cv.guardar_cv(partes(2)))
+    assert primero[0] == segundo[0]
+    assert (primero[2], segundo[2]) == (False, True)
+    assert os.listdir(tmp_path / "tmp") == []
+
+
+def test_size_limit_stops_early(tmp_path, monkeypatch):
+    monkeypatch.setattr(cv, "CV_DIR", str(tmp_path))
+    monkeypatch.setattr(cv, "CV_MAX_BYTES", 100_000)
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(cv.guardar_cv(partes(1000)))
+    assert error.value.status_code == 413
+    # el temporal se borra
+    assert os.listdir(tmp_path / "tmp") == []